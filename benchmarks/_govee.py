@@ -0,0 +1,14 @@
+# Imports the package govee_h5075 from the parent directory for benchmarks
+import importlib
+import os
+import sys
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+
+def load():
+
+    if _ROOT not in sys.path:
+        sys.path.insert(0, _ROOT)
+
+    return importlib.import_module("govee_h5075")
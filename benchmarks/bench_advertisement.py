@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+# Benchmark for the advertisement callback of scan/measure with a stream of
+# advertisements where most of them are from devices other than Govee.
+import argparse
+import random
+import struct
+import time
+from datetime import datetime
+
+import _govee
+
+govee = _govee.load()
+Measurement = govee.Measurement
+LOGGER = govee.LOGGER
+MyLogger = govee.MyLogger
+
+
+class Device():
+
+    def __init__(self, address: str, name: str) -> None:
+
+        self.address: str = address
+        self.name: str = name
+
+
+class AdvertisementData():
+
+    def __init__(self, manufacturer_data: dict, rssi: int = -70) -> None:
+
+        self.manufacturer_data: dict = manufacturer_data
+        self.rssi: int = rssi
+
+
+def legacy_callback(consumer, unique: bool = True, progress=None):
+
+    # previous implementation of the callback in GoveeThermometerHygrometer.scan
+    found_devices = list()
+
+    def decode_5074(bytes) -> 'tuple[float,float]':
+        temperatureC, relHumidity = struct.unpack("<hh", bytes[1:5])
+        temperatureC /= 100
+        relHumidity /= 100
+        battery = bytes[5]
+
+        return round(temperatureC, 1), round(relHumidity, 1), battery
+
+    def decode_5179(mfg_data):
+        temp, hum, batt = struct.unpack_from("<HHB", mfg_data, 4)
+        temperature = float(Measurement.twos_complement(temp) / 100.0)
+        humidity = float(hum / 100.0)
+        battery = int(batt)
+
+        return temperature, humidity, battery
+
+    def callback(device, advertising_data):
+
+        if unique is False or device.address not in found_devices:
+            if 0xec88 in advertising_data.manufacturer_data \
+                    or 0x8801 in advertising_data.manufacturer_data:
+                found_devices.append(device.address)
+                LOGGER.debug(f"Found {device.address} ({device.name})")
+            if device.name and device.address.upper()[0:9] in ["A4:C1:38:", "1C:9F:24:"]:
+                if 0xec88 in advertising_data.manufacturer_data:
+                    LOGGER.debug(
+                        f"{device.address} ({device.name}): Received advertisement data({MyLogger.hexstr(advertising_data.manufacturer_data[0xec88])})")
+
+                    if device.address in govee.alias.aliases:
+                        humidityOffset = govee.alias.aliases[device.address][1] if govee.alias.aliases[device.address][1] else 0.0
+                        temperatureOffset = govee.alias.aliases[device.address][
+                            2] if govee.alias.aliases[device.address][2] else 0.0
+                    else:
+                        humidityOffset = 0.0
+                        temperatureOffset = 0.0
+
+                    if "H5074" in device.name:
+                        temperatureC, relHumidity, battery = decode_5074(
+                            advertising_data.manufacturer_data[0xec88])
+                        measurement = Measurement(
+                            datetime.now(), temperatureC, relHumidity, 0, 0)
+                    else:
+                        measurement = Measurement.from_bytes(
+                            bytes=advertising_data.manufacturer_data[0xec88][1:4], humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+                        battery = advertising_data.manufacturer_data[0xec88][4]
+
+                    LOGGER.debug(f"{device.address}: Decoded measurement data("
+                                 f"{MyLogger.hexstr(advertising_data.manufacturer_data[0xec88][0:4])}) is temperature={measurement.temperatureC}°C, humidity={measurement.relHumidity}%")
+                    LOGGER.debug(f"{device.address}: Decoded battery data("
+                                 f"{hex(advertising_data.manufacturer_data[0xec88][4])}) is {battery}%")
+
+                    consumer(device.address, device.name,
+                             battery, measurement)
+                elif 0x8801 in advertising_data.manufacturer_data:
+                    LOGGER.debug(
+                        f"{device.address} ({device.name}): Received advertisement data({MyLogger.hexstr(advertising_data.manufacturer_data[0x8801])})")
+
+                    temperatureC, relHumidity, battery = decode_5179(
+                        advertising_data.manufacturer_data[0x8801])
+                    measurement = Measurement(
+                        datetime.now(), temperatureC, relHumidity, 0, 0)
+                    consumer(device.address, device.name,
+                             battery, measurement)
+
+            elif device.name and progress:
+                progress(len(found_devices))
+
+    return callback
+
+
+def advertisements(n: int, ratio: float, devices: int) -> 'list[tuple[Device, AdvertisementData]]':
+
+    rnd = random.Random(5075)
+
+    govees = list()
+    for i in range(devices):
+        address = "A4:C1:38:%02X:%02X:%02X" % (i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff)
+        model = ("H5075", "H5074", "H5179")[i % 3]
+        if model == "H5075":
+            raw = rnd.randint(0, 400) * 1000 + rnd.randint(100, 999)
+            data = {0xec88: bytes([0]) + raw.to_bytes(3, "big") + bytes([85, 0])}
+        elif model == "H5074":
+            data = {0xec88: struct.pack("<xhhBx", rnd.randint(-2000, 4000), rnd.randint(1000, 9999), 85)}
+        else:
+            data = {0x8801: struct.pack("<4xhHBx", rnd.randint(-2000, 4000), rnd.randint(1000, 9999), 85)}
+        govees.append((Device(address, f"GV{model}_{i:04X}"), AdvertisementData(data)))
+
+    others = list()
+    for i in range(1000):
+        address = "%02X:%02X:%02X:%02X:%02X:%02X" % tuple(rnd.randint(0, 255) for _ in range(6))
+        data = {rnd.choice((0x004c, 0x0006, 0x0075, 0x0087)): bytes(rnd.randint(4, 24))}
+        others.append((Device(address, rnd.choice((None, "Phone", "Headset", "TV"))), AdvertisementData(data)))
+
+    return [rnd.choice(govees) if rnd.random() < ratio else rnd.choice(others) for _ in range(n)]
+
+
+def run(callback, stream: 'list[tuple[Device, AdvertisementData]]') -> float:
+
+    start = time.perf_counter()
+    for device, advertising_data in stream:
+        callback(device, advertising_data)
+
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the advertisement callback of scan/measure in callbacks per second")
+    parser.add_argument("-n", type=int, default=1_000_000,
+                        help="number of advertisements, default 1,000,000")
+    parser.add_argument("--ratio", type=float, default=0.05,
+                        help="share of advertisements from Govee thermometers, default 0.05")
+    parser.add_argument("--devices", type=int, default=50,
+                        help="number of Govee thermometers, default 50")
+    args = parser.parse_args()
+
+    stream = advertisements(args.n, args.ratio, args.devices)
+
+    def consumer(address, name, battery, measurement) -> None:
+        pass
+
+    print(f"{'Implementation':20} {'Time':>10} {'Callbacks/s':>14}")
+    for name, factory in (("before", legacy_callback), ("after", govee.GoveeThermometerHygrometer.advertisement_callback)):
+        duration = run(factory(consumer, unique=False), stream)
+        print(f"{name:20} {duration:9.3f}s {args.n / duration:14,.0f}")
@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+# Load test of the scan pipeline of measure mode with a firehose of synthetic
+# advertisements from thousands of Govee thermometers mixed with noise of other
+# devices. Reports latency percentiles, CPU and memory per advertisement rate and
+# searches for the maximum rate which is sustainable.
+import argparse
+import asyncio
+import os
+import time
+from array import array
+
+import _govee
+from bench_advertisement import advertisements
+
+govee = _govee.load()
+
+
+def percentile(values: 'list[float]', p: float) -> float:
+
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+async def firehose(stream: list, rate: float, duration: float, queue_size: int) -> dict:
+
+    # advertisements are due at fixed times. Latency is the time from being due until the callback has returned,
+    # i.e. it grows if the callback falls behind
+    writer = govee.Writer.create(
+        "table", file=open(os.devnull, "w"), flush_interval=1.0, live=True)
+    queue = govee.ScanQueue(maxsize=queue_size)
+    readings = govee.LatestReadings()
+    callback = govee.GoveeThermometerHygrometer.advertisement_callback(
+        queue.put, unique=False, readings=readings)
+
+    async def consume() -> None:
+
+        while True:
+            address, name, battery, measurement = await queue.get()
+            writer.measurement(address, name, battery, measurement)
+
+    consumer = asyncio.ensure_future(consume())
+    latencies = array("d")
+    total = int(rate * duration)
+    sent = 0
+    cpu = time.process_time()
+    start = time.perf_counter()
+    try:
+        while sent < total:
+            due = min(total, int((time.perf_counter() - start) * rate) + 1)
+            while sent < due:
+                device, advertising_data = stream[sent % len(stream)]
+                callback(device, advertising_data)
+                latencies.append(time.perf_counter() - start - sent / rate)
+                sent += 1
+
+            await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+
+    finally:
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        consumer.cancel()
+        writer.close()
+
+    latencies = sorted(latencies)
+    return {
+        "rate": rate,
+        "achieved": sent / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p90": percentile(latencies, 0.90),
+        "p99": percentile(latencies, 0.99),
+        "max": latencies[-1] if latencies else 0.0,
+        "cpu": cpu / elapsed,
+        "queued": queue.queued,
+        "dropped": queue.dropped,
+        "devices": len(readings),
+        "rss": govee.peak_memory()
+    }
+
+
+def report(result: dict, sustainable: bool) -> None:
+
+    rss = f"{result['rss'] / 1024 / 1024:.1f}MB" if result["rss"] else "n/a"
+    print(f"{result['rate']:10,.0f} {result['achieved']:10,.0f} {result['p50'] * 1000:8.2f} {result['p90'] * 1000:8.2f} "
+          f"{result['p99'] * 1000:8.2f} {result['max'] * 1000:8.2f} {result['cpu']:6.0%} {result['dropped']:8d} "
+          f"{result['devices']:8d} {rss:>8}  {'yes' if sustainable else 'no'}", flush=True)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Load test of the scan pipeline of measure mode with synthetic advertisements")
+    parser.add_argument("--devices", type=int, default=5000,
+                        help="number of simulated Govee thermometers, default 5,000")
+    parser.add_argument("--ratio", type=float, default=0.2,
+                        help="share of advertisements from Govee thermometers, default 0.2")
+    parser.add_argument("--rate", type=float, default=1000,
+                        help="advertisements per second to start with, default 1,000")
+    parser.add_argument("--duration", type=float, default=2.0,
+                        help="seconds per rate, default 2.0")
+    parser.add_argument("--max-latency", type=float, default=0.05,
+                        help="p99 latency in seconds up to which a rate is sustainable, default 0.05")
+    parser.add_argument("--max-drop", type=float, default=0.0,
+                        help="share of decoded advertisements which may be dropped by the queue, default 0.0")
+    parser.add_argument("--steps", type=int, default=4,
+                        help="steps of bisection after the first rate which isn't sustainable, default 4")
+    parser.add_argument("--queue-size", type=int, default=256,
+                        help="size of the queue between scan callback and output, default 256")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="seconds between two advertisements of a thermometer in order to estimate the number of sensors, default 2.0")
+    args = parser.parse_args()
+
+    govee.LOGGER.level = govee.MyLogger.WARN
+    stream = advertisements(200_000, args.ratio, args.devices)
+
+    print(f"{'Rate':>10} {'Achieved':>10} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'CPU':>6} "
+          f"{'Dropped':>8} {'Devices':>8} {'RSS':>8}  Sustainable")
+
+    def sustainable(result: dict) -> bool:
+
+        return result["p99"] <= args.max_latency and result["achieved"] >= 0.95 * result["rate"] \
+            and result["dropped"] <= args.max_drop * result["queued"]
+
+    # double the rate until it isn't sustainable anymore, then bisect
+    good, bad = 0.0, None
+    rate = args.rate
+    while bad is None:
+        result = asyncio.run(firehose(stream, rate, args.duration, args.queue_size))
+        ok = sustainable(result)
+        report(result, ok)
+        if ok:
+            good, rate = rate, rate * 2
+        else:
+            bad = rate
+
+    for _ in range(args.steps):
+        rate = (good + bad) / 2
+        result = asyncio.run(firehose(stream, rate, args.duration, args.queue_size))
+        ok = sustainable(result)
+        report(result, ok)
+        if ok:
+            good = rate
+        else:
+            bad = rate
+
+    print(f"\nMaximum sustainable rate: {good:,.0f} advertisements/s with p99 latency <= {args.max_latency * 1000:.0f} ms "
+          f"and {args.max_drop:.0%} dropped")
+    print(f"That is about {good * args.ratio * args.interval:,.0f} thermometers advertising every {args.interval:.0f} seconds "
+          f"if {args.ratio:.0%} of advertisements are from Govee thermometers")
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+# Benchmark for the startup time of the library and the shell script measured
+# by "python -X importtime" in fresh interpreters.
+import argparse
+import os
+import subprocess
+import sys
+
+import _govee
+
+# module imported by the library, the shell script and bluetooth requests
+TARGETS = [("library", "govee_h5075"),
+           ("shell script", "govee_h5075.cli"),
+           ("bluetooth", "govee_h5075.device")]
+
+
+def importtime(module: str) -> 'tuple[int, bool]':
+
+    # cumulative import time of given module in microseconds and whether bleak has been imported
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [_govee._ROOT, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, capture_output=True, text=True, check=True)
+
+    cumulative = 0
+    bleak = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, us, name = line.split("|")
+        if not us.strip().isdigit():
+            continue
+
+        name = name.strip()
+        bleak = bleak or name == "bleak"
+        if name == module:
+            cumulative = int(us)
+
+    return cumulative, bleak
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the import time of the package govee_h5075")
+    parser.add_argument("-n", type=int, default=10,
+                        help="number of fresh interpreters per module, best run is reported, default 10")
+    args = parser.parse_args()
+
+    print(f"{'Import':14} {'Module':20} {'Time':>10}  bleak")
+    for name, module in TARGETS:
+        runs = [importtime(module) for _ in range(args.n)]
+        print(f"{name:14} {module:20} {min(us for us, _ in runs) / 1000:8.1f}ms  {'yes' if runs[0][1] else 'no'}")
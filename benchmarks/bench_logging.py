@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# Benchmark for the decode loop of recorded data at log level WARN where debug
+# messages are not printed but have been formatted anyway.
+import argparse
+import struct
+import time
+from datetime import timedelta
+
+import _govee
+
+govee = _govee.load()
+LOGGER = govee.LOGGER
+Measurement = govee.Measurement
+
+
+def legacy_hexstr(ba: bytearray) -> str:
+
+    # previous implementation of MyLogger.hexstr
+    return " ".join([("0" + hex(b).replace("0x", ""))[-2:] for b in ba])
+
+
+def legacy_receive_records(device, bytes: bytearray) -> None:
+
+    # previous implementation of the notification handler for data with eagerly formatted debug messages
+    LOGGER.debug(f"{device.address}: <<< received notification with measurement data ("
+                 f"{legacy_hexstr(bytes)})")
+
+    for i in range(6):
+        minutes_back = struct.unpack(">H", bytes[0:2])[0]
+        if bytes[2 + 3 * i] == 0xff:
+            continue
+
+        timestamp = device._data_control.timestamp - \
+            timedelta(minutes=minutes_back - i)
+        _ba = bytearray(bytes[2 + 3 * i:5 + 3 * i])
+        temperatureC, relHumidity = Measurement.decode(bytes=_ba)
+        LOGGER.debug(f"{device.address}: Decoded measurement data("
+                     f"{legacy_hexstr(_ba)}) is temperature={temperatureC + device.temperatureOffset} °C, humidity={relHumidity + device.humidityOffset} %")
+        device._data_control.measurements.append(
+            timestamp, temperatureC, relHumidity)
+
+    device._data_control.count()
+
+
+def frames(n: int) -> 'list[bytes]':
+
+    result = list()
+    for m in range(n):
+        frame = struct.pack(">H", (n - m) * 6 % 0x10000)
+        for i in range(6):
+            frame += (200000 + (m * 6 + i) % 1000).to_bytes(3, "big")
+        result.append(frame)
+
+    return result
+
+
+def run(receive, device, stream: 'list[bytes]') -> float:
+
+    device._data_control = govee.DataControl(expected_msg=len(stream))
+    start = time.perf_counter()
+    for frame in stream:
+        receive(device, frame)
+
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the decode loop of recorded data at log level WARN")
+    parser.add_argument("-n", type=int, default=100_000,
+                        help="number of frames with 6 records each, default 100,000")
+    args = parser.parse_args()
+
+    LOGGER.level = govee.MyLogger.WARN
+    device = govee.GoveeThermometerHygrometer("A4:C1:38:00:00:01")
+    stream = frames(args.n)
+
+    print(f"{'Implementation':20} {'Time':>10} {'Records/s':>12}")
+    for name, receive in (("eager logging", legacy_receive_records), ("lazy logging", govee.GoveeThermometerHygrometer.receive_records)):
+        duration = run(receive, device, stream)
+        print(f"{name:20} {duration:9.3f}s {args.n * 6 / duration:12,.0f}")
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# Benchmark for decoding advertisements into Measurement objects where only
+# temperature and humidity are read, e.g. for alerting in scan callbacks.
+import argparse
+import math
+import random
+import time
+import tracemalloc
+from datetime import datetime
+
+import _govee
+
+govee = _govee.load()
+Measurement = govee.Measurement
+
+
+class EagerMeasurement():
+
+    # previous implementation which computes all derived values in __init__
+    def __init__(self, timestamp: datetime, temperatureC: float, relHumidity: float, humidityOffset: float = 0, temperatureOffset: float = 0) -> None:
+
+        self.timestamp: datetime = timestamp
+        self.humidityOffset: float = humidityOffset
+        self.temperatureOffset: float = temperatureOffset
+        self.temperatureC: float = temperatureC + temperatureOffset
+        self.relHumidity: float = relHumidity + humidityOffset
+
+        z1 = (7.45 * self.temperatureC) / (235 + self.temperatureC)
+        es = 6.1 * math.exp(z1*2.3025851)
+        e = es * self.relHumidity / 100.0
+        z2 = e / 6.1
+
+        self.absHumidity: float = round(
+            (216.7 * e) / (273.15 + self.temperatureC) * 10) / 10.0
+
+        z3 = 0.434292289 * math.log(z2)
+        self.dewPointC: float = int((235 * z3) / (7.45 - z3) * 10) / 10.0
+        self.steamPressure: float = int(e * 10) / 10.0
+
+        self.temperatureF: float = Measurement.to_fahrenheit(self.temperatureC)
+        self.dewPointF: float = Measurement.to_fahrenheit(self.dewPointC)
+
+
+def advertisements(n: int) -> 'list[bytes]':
+
+    rnd = random.Random(5075)
+    payloads = list()
+    for _ in range(1000):
+        temperature = rnd.randint(-200, 400)
+        humidity = rnd.randint(100, 999)
+        raw = abs(temperature) * 1000 + humidity
+        if temperature < 0:
+            raw |= 0x800000
+        payloads.append(raw.to_bytes(3, "big"))
+
+    return [payloads[i % len(payloads)] for i in range(n)]
+
+
+def decode(cls, payloads: 'list[bytes]', keep: int = 0) -> 'tuple[float, list]':
+
+    timestamp = datetime.now()
+    kept = list()
+    alerts = 0
+    start = time.perf_counter()
+    for payload in payloads:
+        temperatureC, relHumidity = Measurement.decode(payload)
+        m = cls(timestamp, temperatureC, relHumidity)
+        if m.temperatureC > 30.0 or m.relHumidity > 90.0:
+            alerts += 1
+        if keep:
+            kept.append(m)
+
+    return time.perf_counter() - start, kept
+
+
+def memory(cls, payloads: 'list[bytes]') -> 'tuple[int, int]':
+
+    tracemalloc.start()
+    _, kept = decode(cls, payloads, keep=len(payloads))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark lazy vs. eager Measurement on a stream of advertisement decodes")
+    parser.add_argument("-n", type=int, default=1_000_000,
+                        help="number of decodes, default 1,000,000")
+    parser.add_argument("--keep", type=int, default=100_000,
+                        help="number of measurements retained for the allocation test, default 100,000")
+    args = parser.parse_args()
+
+    payloads = advertisements(args.n)
+
+    print(f"{'Implementation':20} {'Time':>10} {'Decodes/s':>12} {'Bytes/object':>13}")
+    for name, cls in (("eager Measurement", EagerMeasurement), ("lazy Measurement", Measurement)):
+        duration, _ = decode(cls, payloads)
+        current, _ = memory(cls, payloads[:args.keep])
+        print(f"{name:20} {duration:9.3f}s {args.n / duration:12,.0f} {current / args.keep:13.1f}")
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# Soak test of the advertisement callback in measure mode which reports the
+# resident memory while feeding millions of advertisements from devices which
+# come and go.
+import argparse
+import os
+import random
+import struct
+
+import _govee
+from bench_advertisement import AdvertisementData, Device, legacy_callback
+
+govee = _govee.load()
+
+
+def rss() -> int:
+
+    # current resident memory in bytes, peak memory if /proc isn't available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    except OSError:
+        return govee.peak_memory()
+
+
+def advertisements(n: int, devices: int, churn: int):
+
+    # each block of <churn> advertisements brings a new generation of devices
+    rnd = random.Random(5075)
+    for i in range(n):
+        generation = i // churn
+        d = generation * devices + rnd.randrange(devices)
+        if rnd.random() < 0.9:
+            yield Device("%02X:%02X:%02X:%02X:%02X:%02X" % tuple(rnd.randint(0, 255) for _ in range(6)), None), AdvertisementData({0x004c: b"\x10\x05"})
+        else:
+            address = "A4:C1:38:%02X:%02X:%02X" % (d >> 16 & 0xff, d >> 8 & 0xff, d & 0xff)
+            raw = rnd.randint(0, 400) * 1000 + rnd.randint(100, 999)
+            yield Device(address, "GVH5075_%04X" % (d & 0xffff)), AdvertisementData({0xec88: struct.pack(">I", raw) + bytes([85, 0])})
+
+
+class Clock():
+
+    # simulated time which advances with each reading so that eviction happens without waiting
+    def __init__(self, rate: float) -> None:
+
+        self.now: float = 0.0
+        self.step: float = 1.0 / rate
+
+    def __call__(self) -> float:
+
+        self.now += self.step
+        return self.now
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Soak test of measure mode that reports resident memory over millions of advertisements")
+    parser.add_argument("-n", type=int, default=5_000_000,
+                        help="number of advertisements, default 5,000,000")
+    parser.add_argument("--devices", type=int, default=100,
+                        help="number of Govee thermometers in range at the same time, default 100")
+    parser.add_argument("--churn", type=int, default=100_000,
+                        help="number of advertisements after which all devices are replaced, default 100,000")
+    parser.add_argument("--evict", type=float, default=1.0,
+                        help="minutes after which devices which haven't been seen are evicted, default 1.0")
+    parser.add_argument("--rate", type=float, default=100.0,
+                        help="simulated readings per second from all Govee thermometers, default 100")
+    parser.add_argument("--legacy", action="store_true",
+                        help="run previous implementation of the callback")
+    args = parser.parse_args()
+
+    def consumer(address, name, battery, measurement) -> None:
+        pass
+
+    readings = govee.LatestReadings(max_age=args.evict * 60, clock=Clock(args.rate))
+    callback = legacy_callback(consumer, unique=False) if args.legacy else govee.GoveeThermometerHygrometer.advertisement_callback(
+        consumer, unique=False, readings=readings)
+
+    step = max(1, args.n // 10)
+    print(f"{'Advertisements':>14} {'RSS':>10} {'Devices':>8}")
+    for i, (device, advertising_data) in enumerate(advertisements(args.n, args.devices, args.churn), start=1):
+        callback(device, advertising_data)
+        if i % step == 0:
+            print(f"{i:14,} {rss() / 1024 / 1024:8.1f}MB {len(readings):8}", flush=True)
+
+    print(f"peak memory: {govee.peak_memory() / 1024 / 1024:.1f} MB")
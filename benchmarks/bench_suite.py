@@ -0,0 +1,215 @@
+#!/usr/bin/python3
+# Micro-benchmark suite for decoders, frame codec, derived values and import
+# time. Results can be saved as JSON and compared against a stored baseline in
+# order to make regressions of hot paths and startup visible.
+import argparse
+import json
+import os
+import platform
+import struct
+import sys
+import timeit
+from datetime import datetime
+
+import _govee
+from bench_importtime import TARGETS, importtime
+
+govee = _govee.load()
+Measurement = govee.Measurement
+MeasurementBatch = govee.MeasurementBatch
+Codec = govee.Codec
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+TIMESTAMP = datetime(2024, 1, 1, 12, 0)
+CODEC = Codec()
+
+H507X_FRAME = struct.pack(">H", 480) + b"".join(
+    (203000 + 500 + i).to_bytes(3, "big") for i in range(6))
+H5179_FRAME = struct.pack("<I", 28_000_000) + b"".join(
+    struct.pack("<hH", 2150 + i, 4550 + i) for i in range(4))
+RESPONSE_FRAME = Codec._encode(bytes([0xaa, 0x03]), bytes(
+    [0x01, 0xb8, 0x0b, 0x4c, 0x1d]), Codec.FRAME_LENGTH)
+ALARM = govee.Alarm(active=True, lower=30.0, upper=75.0)
+BATCH = MeasurementBatch()
+for _i in range(1000):
+    BATCH.append(TIMESTAMP, 15.0 + _i % 100 / 10, 40.0 + _i % 300 / 10)
+
+
+def derived() -> float:
+
+    m = Measurement(TIMESTAMP, 21.5, 45.5)
+    return m.dewPointC + m.absHumidity + m.steamPressure
+
+
+def batch_derived() -> None:
+
+    BATCH._derived = None
+    BATCH.rows()
+
+
+# name, function and number of operations per call
+CASES = [
+    ("Measurement.from_bytes 3 bytes", lambda: Measurement.from_bytes(
+        b"\x03\x1e\x4c", timestamp=TIMESTAMP), 1),
+    ("Measurement.from_bytes 4 bytes", lambda: Measurement.from_bytes(
+        b"\x66\x08\x88\x13", timestamp=TIMESTAMP, little_endian=True), 1),
+    ("unpack_H5179_history_record", lambda: Measurement.unpack_H5179_history_record(
+        b"\x66\x08\x88\x13", timestamp=TIMESTAMP), 1),
+    ("MacAndSerial.decode_mac", lambda: govee.MacAndSerial.decode_mac(
+        b"\x23\x41\x68\x38\xc1\xa4"), 1),
+    ("Alarm.from_bytes", lambda: govee.Alarm.from_bytes(
+        b"\x01\xb8\x0b\x4c\x1d", unit=" %"), 1),
+    ("Alarm.to_bytes", ALARM.to_bytes, 1),
+    ("Codec.encode without params", lambda: CODEC.encode(
+        bytes([0xaa, 0x03])), 1),
+    ("Codec.encode with params", lambda: CODEC.encode(
+        bytes([0x33, 0x03]), params=ALARM.to_bytes()), 1),
+    ("Codec.decode response", lambda: CODEC.decode(RESPONSE_FRAME), 1),
+    ("decode_records_H507x 6 records", lambda: Codec.decode_records_H507x(
+        H507X_FRAME), 1),
+    ("decode_records_H5179 4 records", lambda: Codec.decode_records_H5179(
+        H5179_FRAME), 1),
+    ("Measurement derived values", derived, 1),
+    ("MeasurementBatch derived values", batch_derived, len(BATCH)),
+]
+
+
+def calibrate() -> int:
+
+    # plain python loop in order to compare results relative to the speed of the machine
+    total = 0
+    for i in range(100):
+        total += i * 2
+
+    return total
+
+
+def run(function, operations: int, repeat: int, min_time: float) -> float:
+
+    # best of repeated runs in nanoseconds per operation
+    timer = timeit.Timer(function)
+    number, duration = timer.autorange()
+    number = max(number, int(number * min_time / duration)) if duration else number
+    return min(timer.repeat(repeat=repeat, number=number)) / number / operations * 1e9
+
+
+def run_import(module: str, runs: int) -> 'tuple[float, bool]':
+
+    # best import time in fresh interpreters in nanoseconds and whether bleak has been imported
+    results = [importtime(module) for _ in range(runs)]
+    return min(us for us, _ in results) * 1000.0, any(bleak for _, bleak in results)
+
+
+def metadata() -> dict:
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "numpy": bool(MeasurementBatch.numpy()),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> 'list[str]':
+
+    # changes are relative to the calibration loop if both runs have one, so that a baseline of another
+    # machine is roughly comparable. Importing bleak by the library or the shell script is always a regression
+    regressions = list()
+    print(f"{'Benchmark':34} {'ns/op':>12} {'Baseline':>12} {'Change':>8}")
+    for name, result in results.items():
+        base = baseline["results"].get(name)
+        if not base:
+            print(f"{name:34} {result['ns']:12.1f} {'-':>12} {'-':>8}")
+            continue
+
+        relative = "relative" in result and "relative" in base
+        change = (result["relative"] / base["relative"] if relative else result["ns"] / base["ns"]) - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  regression"
+
+        if result.get("bleak") and base.get("bleak") is False:
+            regressions.append(name)
+            flag += "  imports bleak"
+
+        print(f"{name:34} {result['ns']:12.1f} {base['ns']:12.1f} {change:+8.1%}{flag}")
+
+    return regressions
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Run micro-benchmarks of decoders and derived values and compare against a baseline")
+    parser.add_argument("-k", metavar="<text>",
+                        help="run only benchmarks whose name contains given text")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of timed runs per benchmark, best run is reported, default 5")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds per timed run, default 0.2")
+    parser.add_argument("--json", metavar="<file>",
+                        help="write results as JSON to given file, - for stdout")
+    parser.add_argument("--save", action="store_true",
+                        help=f"save results as new baseline in {os.path.basename(BASELINE)}")
+    parser.add_argument("--baseline", metavar="<file>", nargs="?", const=BASELINE,
+                        help="compare with baseline, default benchmarks/baseline.json")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown which is reported as regression, default 0.25")
+    parser.add_argument("--imports", type=int, default=5,
+                        help="number of fresh interpreters per import benchmark, best run is reported, 0 skips them, default 5")
+    args = parser.parse_args()
+
+    govee.LOGGER.level = govee.MyLogger.WARN
+    calibration = run(calibrate, 100, args.repeat, args.min_time)
+    results: 'dict[str, dict]' = dict()
+    for name, function, operations in CASES:
+        if args.k and args.k.lower() not in name.lower():
+            continue
+
+        ns = run(function, operations, args.repeat, args.min_time)
+        results[name] = {"ns": round(ns, 2), "ops": round(1e9 / ns)}
+        if not args.baseline:
+            print(f"{name:34} {ns:12.1f} ns/op {1e9 / ns:14,.0f} ops/s", flush=True)
+
+    for target, module in TARGETS if args.imports else []:
+        name = f"import {module}"
+        if args.k and args.k.lower() not in name.lower():
+            continue
+
+        ns, bleak = run_import(module, args.imports)
+        results[name] = {"ns": round(ns, 2), "ops": round(1e9 / ns), "bleak": bleak}
+        if not args.baseline:
+            print(f"{name:34} {ns:12.1f} ns/op {'imports bleak' if bleak else '':>14}", flush=True)
+
+    # the CPU may still be ramping up at start, so the faster calibration is taken
+    calibration = min(calibration, run(calibrate, 100, args.repeat, args.min_time))
+    for result in results.values():
+        result["relative"] = round(result["ns"] / calibration, 3)
+
+    report = {"meta": metadata(), "calibration": round(calibration, 3), "results": results}
+    if args.json:
+        if args.json == "-":
+            print(json.dumps(report, indent=2))
+        else:
+            with open(args.json, "w") as out:
+                json.dump(report, out, indent=2)
+
+    if args.save:
+        with open(BASELINE, "w") as out:
+            json.dump(report, out, indent=2)
+            out.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r") as ins:
+            baseline = json.load(ins)
+
+        if {k: v for k, v in baseline["meta"].items() if k != "date"} != {k: v for k, v in report["meta"].items() if k != "date"}:
+            print(f"Baseline has been taken on a different setup ({baseline['meta']}), changes are relative to "
+                  f"the calibration loop but may still be off. Save a baseline on this machine for reliable results", file=sys.stderr)
+
+        if compare(results, baseline, args.threshold):
+            exit(1)
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+# Benchmark for the transfer of recorded data from simulated devices through
+# connect, notification handlers and requestRecordedData without a sensor.
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import _govee
+
+govee = _govee.load()
+SimulatedDevice = govee.SimulatedDevice
+
+
+async def transfer(device: SimulatedDevice, minutes: int, timeout: float, stream: bool) -> 'tuple[int, bool, float]':
+
+    client = govee.SimulatedGoveeThermometerHygrometer(device)
+    await client.connect()
+    try:
+        if device.model == "H5179":
+            end = govee.Measurement.minutes_since_1970(datetime.now())
+            start, end = end - minutes, end
+        else:
+            start, end = minutes, 0
+
+        started = time.perf_counter()
+        if stream:
+            records = 0
+            # an unlimited simulator sends faster than the loop runs the consumer, so all batches are buffered
+            async for batch in client.iterRecordedData(start=start, end=end, device_type=device.model, timeout=timeout, max_pending=None):
+                records += len(batch)
+            complete = batch.complete
+        else:
+            measurements = await client.requestRecordedData(start=start, end=end, device_type=device.model, timeout=timeout)
+            records, complete = len(measurements), measurements.complete
+
+        return records, complete, time.perf_counter() - started
+
+    finally:
+        await client.disconnect()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the transfer of recorded data from simulated devices in records per second")
+    parser.add_argument("--minutes", type=int, default=28800,
+                        help="minutes of recorded data, default 28800 (20 days)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="notifications per second, default unlimited")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="random delay of each notification in seconds, default 0.0")
+    parser.add_argument("--loss", type=float, default=0.0,
+                        help="probability that a notification gets lost, default 0.0")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="delay of responses in seconds, default 0.0")
+    parser.add_argument("--timeout", type=float, default=1.0,
+                        help="seconds without notification after which the transfer is aborted, default 1.0")
+    args = parser.parse_args()
+
+    govee.LOGGER.level = govee.MyLogger.WARN
+    print(f"{'Model':8} {'API':20} {'Records':>8} {'Time':>9} {'Records/s':>11}  Status")
+    for i, model in enumerate(SimulatedDevice.MODELS):
+        for api, stream in (("requestRecordedData", False), ("iterRecordedData", True)):
+            device = SimulatedDevice(f"A4:C1:38:00:00:{i:02X}", model=model, rate=args.rate,
+                                     jitter=args.jitter, loss=args.loss, latency=args.latency, seed=5075)
+            records, complete, duration = asyncio.run(
+                transfer(device, args.minutes, args.timeout, stream))
+            print(f"{model:8} {api:20} {records:8d} {duration:8.3f}s {records / duration:11,.0f}  "
+                  f"{'complete' if complete else 'incomplete'}")
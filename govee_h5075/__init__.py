@@ -0,0 +1,52 @@
+# Library for Govee H5075, H5074 and H5179 thermometers / hygrometers
+#
+# Decoding of measurements and advertisements doesn't require bleak. Bluetooth
+# classes, store, writers and the alias of known devices are loaded on first use.
+from .core import (LOGGER, AdvertisementDecoder, Alarm, Codec, EmissionPolicy, LatestReadings, MacAndSerial, Measurement,
+                   MeasurementBatch, MyLogger)
+
+_LAZY = {
+    "DataControl": "flow",
+    "ScanQueue": "flow",
+    "GoveeThermometerHygrometer": "device",
+    "DevicePool": "device",
+    "Alias": "storage",
+    "MeasurementStore": "storage",
+    "HistorySync": "storage",
+    "MetadataCache": "storage",
+    "Sightings": "storage",
+    "home_directory": "storage",
+    "peak_memory": "storage",
+    "alias": "storage",
+    "Writer": "writers",
+    "TableWriter": "writers",
+    "JsonWriter": "writers",
+    "NdjsonWriter": "writers",
+    "CsvWriter": "writers",
+    "METRICS": "metrics",
+    "Metrics": "metrics",
+    "Histogram": "metrics",
+    "TRACER": "trace",
+    "Tracer": "trace",
+    "main": "cli",
+    "SimulatedDevice": "simulator",
+    "SimulatedClient": "simulator",
+    "SimulatedGoveeThermometerHygrometer": "simulator",
+}
+
+__all__ = ["LOGGER", "AdvertisementDecoder", "Alarm", "Codec", "EmissionPolicy", "LatestReadings", "MacAndSerial",
+           "Measurement", "MeasurementBatch", "MyLogger"] + list(_LAZY)
+
+
+def __getattr__(name: str):
+
+    if name in _LAZY:
+        from importlib import import_module
+        return getattr(import_module(f".{_LAZY[name]}", __name__), name)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> 'list[str]':
+
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,806 @@
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING
+
+from . import storage
+from .core import LOGGER, Alarm, EmissionPolicy, LatestReadings, Measurement, MeasurementBatch, MyLogger
+from .flow import ScanQueue
+from .metrics import METRICS
+from .trace import TRACER
+from .storage import HistorySync, MeasurementStore, MetadataCache, Sightings, home_directory, peak_memory
+from .writers import TableWriter, Writer
+
+# bleak is slow to import, so functions which use bluetooth import the device module on demand
+if TYPE_CHECKING:
+    from .device import GoveeThermometerHygrometer
+
+
+def arg_parse(args: 'list[str]') -> dict:
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='govee-h5075.py', description='Shell script in order to request Govee H5075 temperature humidity sensor')
+
+    parser.add_argument('-a', '--address', nargs='+',
+                        help='MAC address or alias. Recorded data can be requested for several devices or "all" known devices')
+    parser.add_argument(
+        '-s', '--scan', help='scan for devices for 20 seconds', action='store_true')
+    parser.add_argument('-m', '--measure',
+                        help='capture measurements/advertisements from nearby devices', action='store_true')
+    parser.add_argument(
+        '--evict', metavar="<minutes>", help='forget devices which have not been seen for given minutes in measure mode', type=float, default=None)
+    parser.add_argument(
+        '--delta', metavar="<value>", help='print measurement in measure mode only if temperature (°C) or humidity (%%) has changed by more than given value', type=float, default=None)
+    parser.add_argument(
+        '--min-interval', metavar="<seconds>", help='print measurements of a device at most once in given seconds in measure mode', type=float, default=None)
+    parser.add_argument(
+        '--heartbeat', metavar="<seconds>", help='print measurement of a device after given seconds in measure mode even if it has not changed', type=float, default=None)
+    parser.add_argument(
+        '--queue-size', metavar="<n>", help='number of measurements which wait for output in measure mode, default 256', type=int, default=256)
+    parser.add_argument(
+        '--drop-policy', help='drop oldest measurement or coalesce measurements of the same device if output falls behind in measure mode, default drop-oldest', choices=ScanQueue.POLICIES, default=ScanQueue.DROP_OLDEST)
+    parser.add_argument(
+        '--status', help='request current temperature, humidity and battery level for given MAC address or alias', action='store_true')
+    parser.add_argument(
+        '-i', '--info', help='request device information and configuration for given MAC address or alias', action='store_true')
+    parser.add_argument(
+        '--set-humidity-alarm', metavar="\"<on|off> <lower> <upper>\"", help='set temperature alarm. Range is from 0.0 to 100.0 in steps of 0.1, e.g. \"on 30.0 75.0\"', type=str)
+    parser.add_argument(
+        '--set-temperature-alarm', metavar="\"<on|off> <lower> <upper>\"", help='set temperature alarm. Range is from -20.0 to 60.0 in steps of 0.1, e.g. \"on 15.0 26.0\"', type=str)
+    parser.add_argument(
+        '--set-humidity-offset', metavar="<offset>", help='set offset for humidity to calibrate. Range is from -20.0 to 20.0 in steps of 0.1, e.g. -5.0', type=float)
+    parser.add_argument(
+        '--set-temperature-offset', metavar="<offset>", help='set offset for temperature to calibrate. Range is from -3.0 to 3.0 in steps of 0.1, e.g. -1.0', type=float)
+    parser.add_argument(
+        '-d', '--data', help='request recorded data for given MAC address or alias', action='store_true')
+    parser.add_argument(
+        '--parallel', metavar="<n>", help='number of devices to request recorded data from at the same time, default 3', type=int, default=3)
+    parser.add_argument(
+        '--start', metavar="<hhh:mm>", help='request recorded data from start time expression, e.g. 480:00 (here max. value 20 days)', type=str, default=None)
+    parser.add_argument(
+        '--end', metavar="<hhh:mm>", help='request recorded data to end time expression, e.g. 480:00 (here max. value 20 days)', type=str, default=None)
+    parser.add_argument(
+        '--store', help='append recorded data or measurements to local store in ~/.govee_history', action='store_true')
+    parser.add_argument(
+        '-q', '--query', help='query local store for given MAC address or alias and time range given by --start and --end', action='store_true')
+    parser.add_argument(
+        '--sync', help='request only recorded data which has not been synced before and merge it into history in ~/.govee_history', action='store_true')
+    parser.add_argument(
+        '--timeout', metavar="<seconds>", help='abort request of recorded data if no data has been received for given seconds, default 10.0', type=float, default=10.0)
+    parser.add_argument(
+        '--connect-timeout', metavar="<seconds>", help='abort connecting after given seconds, failed connects are retried twice, default 10.0', type=float, default=None)
+    parser.add_argument(
+        '--sightings', help='keep devices seen by scan and measure mode in ~/.govee_sightings.json in order to connect to devices which have been seen within 5 minutes without discovering them again (BlueZ only) and to request recorded data of recently seen devices with strongest signal first', action='store_true')
+    parser.add_argument(
+        '--cache-ttl', metavar="<seconds>", help='take alarms and offsets from cache in ~/.govee_metadata.json instead of requesting the device if they are not older than given seconds, 0 disables cache, default 86400', type=float, default=86400.0)
+    parser.add_argument(
+        '--cache-info-ttl', metavar="<seconds>", help='take device name, hardware and firmware version from cache if they are not older than given seconds, default 604800 (7 days)', type=float, default=MetadataCache.TTL["info"])
+    parser.add_argument(
+        '--daemon', help='keep connections to devices and serve requests of --status, --info, --data and --set-* on unix domain socket', action='store_true')
+    parser.add_argument(
+        '--socket', metavar="<path>", help='unix domain socket of daemon, default ~/.govee.sock', type=str, default=os.path.join(home_directory(), ".govee.sock"))
+    parser.add_argument(
+        '--idle-timeout', metavar="<seconds>", help='disconnect from devices which have not been requested for given seconds in daemon mode, default 300', type=float, default=300.0)
+    parser.add_argument(
+        '-j', '--json', help='print in JSON format', action='store_true')
+    parser.add_argument(
+        '--format', help='output format of measurements and recorded data, json is printed as ndjson in scan and measure mode, default table', choices=Writer.FORMATS, default=None)
+    parser.add_argument(
+        '--flush-interval', metavar="<seconds>", help='write buffered output at most every given seconds, default 0 if output is a terminal, otherwise 1.0', type=float, default=None)
+    parser.add_argument(
+        '--stats', metavar="<file>", nargs='?', const='-', help='write counters and latency histograms of connects, requests, transfers and scans as JSON to given file or stderr at exit')
+    parser.add_argument(
+        '--trace', metavar="<file>", help='write timeline of connects, notification setup, GATT writes, notifications and transfers as Chrome trace JSON to given file at exit, e.g. for Perfetto')
+    parser.add_argument(
+        '-l', '--log', help='print logging information', choices=MyLogger.NAMES)
+
+    return parser.parse_args(args)
+
+
+def use_sightings(sightings: Sightings) -> None:
+
+    # devices seen by scans of this or other processes are connected without discovering them again
+    from .device import GoveeThermometerHygrometer
+
+    if sightings:
+        GoveeThermometerHygrometer.sightings = sightings
+
+
+def scan(writer: Writer = None, sightings: Sightings = None):
+
+    from .device import GoveeThermometerHygrometer
+
+    use_sightings(sightings)
+
+    def progress(found: int) -> None:
+
+        print(' %i bluetooth devices seen' % found, end='\r', file=sys.stderr)
+
+    def consumer(address: str, name: str, battery: int, measurement: Measurement) -> None:
+
+        writer.measurement(address, name, battery,
+                           measurement, timestamp=False)
+
+    writer = writer or TableWriter()
+    writer.header(timestamp=False)
+    try:
+        asyncio.run(GoveeThermometerHygrometer.scan(
+            consumer=consumer, progress=progress))
+
+    finally:
+        writer.close()
+        if sightings:
+            sightings.save()
+
+
+def measure(store: MeasurementStore = None, evict: float = None, policy: EmissionPolicy = None, writer: Writer = None, queue: ScanQueue = None, sightings: Sightings = None):
+
+    from .device import GoveeThermometerHygrometer
+
+    use_sightings(sightings)
+
+    async def run() -> None:
+
+        async def flush() -> None:
+
+            # advertisements may pause so buffered lines are flushed periodically. Changes of known devices
+            # are applied without restart and devices seen are shared with other processes
+            while True:
+                await asyncio.sleep(writer.flush_interval or 1.0)
+                writer.flush()
+                storage.alias.refresh()
+                if sightings:
+                    sightings.save(interval=Sightings.SAVE_INTERVAL)
+
+        flusher = asyncio.ensure_future(flush())
+        try:
+            async for address, name, battery, measurement in GoveeThermometerHygrometer.iterScan(unique=False, duration=0, readings=readings, queue=queue):
+                if policy and not policy.accept(address, measurement):
+                    continue
+
+                writer.measurement(address, name, battery, measurement)
+
+        finally:
+            flusher.cancel()
+
+    writer = writer or TableWriter()
+    queue = queue if queue is not None else ScanQueue()
+    if store:
+        # readings are stored before they are queued so that drops of the queue only affect the output
+        queue.on_put.append(
+            lambda address, name, battery, measurement: store.append(address, measurement))
+
+    readings = LatestReadings(max_age=evict * 60 if evict else None)
+    if policy:
+        readings.on_evict.append(policy.forget)
+
+    writer.header()
+    try:
+        asyncio.run(run())
+
+    finally:
+        writer.close()
+        if sightings:
+            sightings.save()
+
+        rss = peak_memory()
+        print(f"Devices: {len(readings)}, evicted: {readings.evicted}, peak memory: "
+              f"{f'{rss / 1024 / 1024:.1f} MB' if rss else 'n/a'}", file=sys.stderr, flush=True)
+        if policy:
+            print(f"Measurements emitted: {policy.emitted}, suppressed: {policy.suppressed}",
+                  file=sys.stderr, flush=True)
+        print(f"Advertisements queued: {queue.queued}, dropped: {queue.dropped}, coalesced: {queue.coalesced}",
+              file=sys.stderr, flush=True)
+
+
+async def request_status(device: 'GoveeThermometerHygrometer') -> None:
+
+    # offsets must be known before the measurement is decoded
+    await asyncio.gather(device.requestHumidityOffset(), device.requestTemperatureOffset())
+    await device.requestMeasurement()
+
+
+def print_status(device: 'GoveeThermometerHygrometer', _json: bool = False, file=None) -> None:
+
+    if _json:
+        print(json.dumps(device.measurement.to_dict(), indent=2), file=file)
+    else:
+        print(str(device.measurement), file=file)
+
+
+async def status(label: str, _json: bool = False, cache: MetadataCache = None, connect_timeout: float = None, sightings: Sightings = None) -> None:
+
+    from .device import GoveeThermometerHygrometer
+
+    use_sightings(sightings)
+
+    mac = storage.alias.resolve(label=label)
+    if not mac:
+        LOGGER.error(f"Unable to resolve alias or mac "
+                     f"{label}. Pls. check ~/.known_govees")
+        return
+
+    device = None
+    try:
+        device = await GoveeThermometerHygrometer.open(
+            mac, cache=cache, timeout=connect_timeout)
+        await request_status(device)
+        print_status(device, _json=_json)
+
+    except Exception as e:
+        LOGGER.error(f"{mac}: {str(e)}")
+
+    finally:
+        if device:
+            await device.disconnect()
+
+
+async def request_device_info(device: 'GoveeThermometerHygrometer') -> None:
+
+    await device.requestDeviceName()
+    await asyncio.gather(device.requestHumidityAlarm(),
+                         device.requestTemperatureAlarm(),
+                         device.requestHumidityOffset(),
+                         device.requestTemperatureOffset(),
+                         device.requestHardwareVersion(),
+                         device.requestFirmwareVersion(),
+                         device.requestBatteryLevel())
+    device_type = device.model
+    if device_type == "H5179":
+        await device.requestMeasurement()
+    else:
+        await device.requestMeasurementAndBattery(device_type)
+
+
+def print_device_info(device: 'GoveeThermometerHygrometer', _json: bool = False, file=None) -> None:
+
+    if _json:
+        print(json.dumps(device.to_dict(), indent=2), file=file)
+    else:
+        print(str(device), file=file)
+
+
+async def device_info(label: str, _json: bool = False, cache: MetadataCache = None, connect_timeout: float = None, sightings: Sightings = None) -> None:
+
+    from .device import GoveeThermometerHygrometer
+
+    use_sightings(sightings)
+
+    device = None
+    try:
+        mac = storage.alias.resolve(label=label)
+        device = await GoveeThermometerHygrometer.open(
+            mac, cache=cache, timeout=connect_timeout)
+        await request_device_info(device)
+        print_device_info(device, _json=_json)
+
+    except Exception as e:
+        LOGGER.error(f"{mac}: {str(e)}")
+
+    finally:
+        if device:
+            await device.disconnect()
+
+
+def parse_configuration(humidityAlarm: str = None, temperatureAlarm: str = None, humidityOffset: float = None, temperatureOffset: float = None) -> dict:
+
+    # validated configuration or None if parameters are incorrect
+    def parseAlarm(arg: str) -> 'tuple[bool, float, float]':
+
+        if not arg:
+            return None, None, None
+
+        m = re.match(
+            r"^(on|off) (-?\d{1,2}\.\d) (-?\d{1,3}\.\d)$", arg.lower())
+        if not m:
+            return None, None, None
+
+        return "on" == m.groups()[0], float(m.groups()[1]), float(m.groups()[2])
+
+    has_errors = False
+    configuration = dict()
+    if humidityAlarm:
+        humidityAlarmActive, humidityAlarmLower, humidityAlarmUpper = parseAlarm(
+            arg=humidityAlarm)
+        if humidityAlarmActive == None or humidityAlarmLower < 0 or humidityAlarmLower > 99.9 or humidityAlarmUpper < 0.1 or humidityAlarmUpper > 100:
+            LOGGER.error("Parameters for humidity alarm are incorrect.")
+            has_errors = True
+        else:
+            configuration["humidityAlarm"] = Alarm(
+                active=humidityAlarmActive, lower=humidityAlarmLower, upper=humidityAlarmUpper, unit=" %")
+
+    if temperatureAlarm:
+        temperatureAlarmActive, temperatureAlarmLower, temperatureAlarmUpper = parseAlarm(
+            arg=temperatureAlarm)
+        if temperatureAlarmActive == None or temperatureAlarmLower < -20.0 or temperatureAlarmLower > 59.9 or temperatureAlarmUpper < -19.9 or temperatureAlarmUpper > 60:
+            LOGGER.error("Parameters for temperature alarm are incorrect.")
+            has_errors = True
+        else:
+            configuration["temperatureAlarm"] = Alarm(
+                active=temperatureAlarmActive, lower=temperatureAlarmLower, upper=temperatureAlarmUpper, unit=" °C")
+
+    if humidityOffset:
+        if humidityOffset < -20.0 or humidityOffset > 20.0:
+            LOGGER.error("Parameter for humidity offset is incorrect.")
+            return None
+
+    if temperatureOffset:
+        if temperatureOffset < -3.0 or temperatureOffset > 3.0:
+            LOGGER.error("Parameter for temperature offset is incorrect.")
+            has_errors = True
+
+    if humidityOffset != None:
+        configuration["humidityOffset"] = humidityOffset
+
+    if temperatureOffset != None:
+        configuration["temperatureOffset"] = temperatureOffset
+
+    return None if has_errors else configuration
+
+
+async def apply_configuration(device: 'GoveeThermometerHygrometer', configuration: dict) -> bool:
+
+    # True if device has acknowledged all settings
+    acknowledged = True
+    if "humidityAlarm" in configuration:
+        acknowledged &= await device.setHumidityAlarm(alarm=configuration["humidityAlarm"])
+
+    if "temperatureAlarm" in configuration:
+        acknowledged &= await device.setTemperatureAlarm(alarm=configuration["temperatureAlarm"])
+
+    if "humidityOffset" in configuration:
+        acknowledged &= await device.setHumidityOffset(offset=configuration["humidityOffset"])
+
+    if "temperatureOffset" in configuration:
+        acknowledged &= await device.setTemperatureOffset(offset=configuration["temperatureOffset"])
+
+    return acknowledged
+
+
+async def configure_device(label: str, humidityAlarm: str = None, temperatureAlarm: str = None, humidityOffset: float = None, temperatureOffset: float = None, cache: MetadataCache = None, connect_timeout: float = None, sightings: Sightings = None) -> None:
+
+    from .device import GoveeThermometerHygrometer
+
+    use_sightings(sightings)
+
+    configuration = parse_configuration(humidityAlarm=humidityAlarm, temperatureAlarm=temperatureAlarm,
+                                        humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+    if configuration is None:
+        return
+
+    device = None
+    try:
+        mac = storage.alias.resolve(label=label)
+        device = await GoveeThermometerHygrometer.open(
+            mac, cache=cache, timeout=connect_timeout)
+        if not await apply_configuration(device, configuration):
+            LOGGER.error(f"{mac}: configuration has not been acknowledged")
+
+    except Exception as e:
+        LOGGER.error(f"{mac}: {str(type(e))} {str(e)}")
+
+    finally:
+        if device:
+            await device.disconnect()
+
+
+def parseTimeStr(s: str) -> int:
+
+    a = s.split(":")
+    return (int(a[0]) * 60 + int(a[1])) if len(a) == 2 else int(a[0])
+
+
+def print_measurements(measurements: MeasurementBatch, _json: bool = False, address: str = None, file=None, format: str = None) -> None:
+
+    writer = Writer.create(format or ("json" if _json else "table"), file=file)
+    writer.records(address, measurements)
+    writer.close()
+
+
+def query(label: str, start: str, end: str, _json: bool = False, store: MeasurementStore = None, format: str = None) -> None:
+
+    mac = storage.alias.resolve(label=label)
+    if not mac:
+        LOGGER.error(f"Unable to resolve alias or mac "
+                     f"{label}. Pls. check ~/.known_govees")
+        return
+
+    now = Measurement.minutes_since_1970(datetime.now())
+    start = now - (parseTimeStr(start) if start else 60)
+    end = now - (parseTimeStr(end) if end else 0)
+
+    store = store or MeasurementStore()
+    print_measurements(store.query(mac, min(start, end),
+                       max(start, end)), _json=_json, format=format)
+
+
+async def request_recorded_data(device: 'GoveeThermometerHygrometer', start: str, end: str, timeout: float = 10.0, history: HistorySync = None, store: MeasurementStore = None, progress=None, sink=None) -> 'tuple[MeasurementBatch, int]':
+
+    def get_1970_offset(minutes_before_now):
+        # Convert time to minutes since 1/1/1970 00:00
+        t_delta = datetime.now() - datetime(year=1970, month=1, day=1)
+        offset = int(t_delta.total_seconds()/60) - minutes_before_now
+        return offset
+
+    mac = device.address
+    since_watermark = start is None
+    # Get device name - this loads self.model with the device type
+    await device.requestDeviceName()
+    device_type = device.model
+    if device_type == "H5179":
+        start = get_1970_offset(parseTimeStr(
+            start)) if start else get_1970_offset(60)
+        end = get_1970_offset(parseTimeStr(
+            end)) if end else get_1970_offset(0)
+        # ensure start time is older than end time
+        starttime = start if start < end else end
+        endtime = end if end > start else start
+    else:
+        start = min(parseTimeStr(start) if start else 60, 28800)
+        end = min(parseTimeStr(end) if end else 0, 28800)
+        # ensure start time is older than end time
+        starttime = start if start > end else end
+        endtime = end if end < start else start
+    LOGGER.debug(
+        f"Device type: {device_type}, start: {str(start)}, end: {str(end)}")
+
+    # requested window in minutes since 1/1/1970 00:00
+    now = Measurement.minutes_since_1970(datetime.now())
+    window = (starttime, endtime) if device_type == "H5179" else (
+        now - starttime, now - endtime)
+
+    watermark = history.watermark(mac) if history else None
+    if watermark:
+        # only request minutes after the last synced minute, without --start all of them that the device keeps
+        LOGGER.info(f"{mac}: last synced minute is "
+                    f"{Measurement.from_minutes_since_1970(watermark).strftime('%Y-%m-%d %H:%M')}")
+        first = max(watermark + 1, now - HistorySync.HISTORY)
+        if device_type == "H5179":
+            starttime = first if since_watermark else max(starttime, watermark + 1)
+        else:
+            starttime = now - first if since_watermark else min(starttime, now - watermark - 1)
+
+    # records can only be passed to sink while being received if they don't have to be merged first
+    streaming = sink and not history and not store
+
+    downloaded = 0
+    if (device_type == "H5179" and starttime <= endtime) or (device_type != "H5179" and starttime >= endtime):
+        await device.requestHumidityOffset()
+        await device.requestTemperatureOffset()
+        if streaming:
+            async for measurements in device.iterRecordedData(start=starttime, end=endtime, device_type=device_type, timeout=timeout, progress=progress):
+                downloaded += len(measurements)
+                sink(measurements)
+
+        else:
+            measurements = await device.requestRecordedData(start=starttime, end=endtime, device_type=device_type, timeout=timeout, progress=progress)
+    else:
+        LOGGER.info(f"{mac}: recorded data is already in sync")
+        measurements = MeasurementBatch()
+
+    if streaming:
+        return measurements, downloaded
+
+    downloaded = len(measurements)
+    if history:
+        # history is printed from the store, but the status is the one of the download
+        history.merge(mac, measurements, start=starttime if device_type == "H5179" else now - starttime)
+        complete = measurements.complete
+        measurements = history.load(mac, *window)
+        measurements.complete = complete
+
+    elif store and measurements.complete:
+        store.append_batch(mac, measurements)
+
+    if sink:
+        sink(measurements)
+
+    return measurements, downloaded
+
+
+async def download_recorded_data(mac: str, start: str, end: str, timeout: float = 10.0, history: HistorySync = None, store: MeasurementStore = None, progress=None, sink=None, cache: MetadataCache = None, connect_timeout: float = None) -> 'tuple[MeasurementBatch, int]':
+
+    from .device import GoveeThermometerHygrometer
+
+    device = await GoveeThermometerHygrometer.open(
+        mac, cache=cache, timeout=connect_timeout)
+    try:
+        return await request_recorded_data(device, start=start, end=end, timeout=timeout, history=history, store=store, progress=progress, sink=sink)
+
+    finally:
+        await device.disconnect()
+
+
+async def recorded_data(labels: 'list[str]', start: str, end: str, _json: bool = False, timeout: float = 10.0, history: HistorySync = None, store: MeasurementStore = None, parallel: int = 3, writer: Writer = None, cache: MetadataCache = None, connect_timeout: float = None, sightings: Sightings = None):
+
+    def progress(received: int, expected: int, records_per_second: float, eta: float) -> None:
+
+        print(f" {received}/{expected} messages received, {records_per_second:.0f} records/s, "
+              f"{'ETA %is' % eta if eta is not None else ''}   ", end='\r', file=sys.stderr)
+
+    use_sightings(sightings)
+    writer = writer or Writer.create("json" if _json else "table")
+    if len(labels) == 1 and labels[0] != "all":
+        mac = storage.alias.resolve(label=labels[0])
+        try:
+            measurements, _ = await download_recorded_data(mac, start=start, end=end, timeout=timeout, history=history, store=store, progress=progress if sys.stderr.isatty() else None, sink=partial(writer.records, mac if writer.interleaved else None) if writer.chunked else None, cache=cache, connect_timeout=connect_timeout)
+            if not writer.chunked:
+                writer.records(None, measurements)
+
+        except Exception as e:
+            LOGGER.error(f"An exception has occured: {str(e)}")
+
+        finally:
+            writer.close()
+
+        return
+
+    macs: 'list[str]' = list()
+    for label in labels:
+        resolved = list(storage.alias.aliases) if label == "all" else [
+            storage.alias.resolve(label=label)]
+        for mac in resolved:
+            if not mac:
+                LOGGER.error(f"Unable to resolve alias or mac "
+                             f"{label}. Pls. check ~/.known_govees")
+            elif mac not in macs:
+                macs.append(mac)
+
+    # recently seen devices with strong signal are downloaded first
+    if sightings:
+        macs = sightings.rank(macs)
+
+    # the adapter can only hold a few connections at the same time
+    semaphore = asyncio.Semaphore(parallel)
+    summary: 'dict[str, tuple[int, float, str]]' = dict()
+
+    async def download(mac: str) -> 'tuple[str, MeasurementBatch]':
+
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                measurements, downloaded = await download_recorded_data(mac, start=start, end=end, timeout=timeout, history=history, store=store, sink=partial(writer.records, mac) if writer.interleaved else None, cache=cache, connect_timeout=connect_timeout)
+                summary[mac] = (downloaded, time.monotonic() - started,
+                                "complete" if measurements.complete else "incomplete")
+                return mac, measurements
+
+            except Exception as e:
+                LOGGER.error(f"{mac}: {str(e)}")
+                summary[mac] = (0, time.monotonic() - started, "failed")
+                return mac, None
+
+    for task in asyncio.as_completed([download(mac) for mac in macs]):
+        mac, measurements = await task
+        if measurements is not None and not writer.interleaved:
+            writer.records(mac, measurements)
+            writer.flush()
+
+    writer.close()
+
+    print("\nMAC-Address/Alias     Records  Duration  Records/s  Status",
+          file=sys.stderr, flush=True)
+    for mac in macs:
+        records, duration, status = summary[mac]
+        label = (storage.alias.aliases[mac][0]
+                 if mac in storage.alias.aliases else mac) + " " * 21
+        print(f"{label[:21]} {records:7d}  {duration:7.1f}s  {records / duration if duration else 0:9.1f}  {status}",
+              file=sys.stderr, flush=True)
+
+async def daemon(path: str, idle_timeout: float = 300.0, cache: MetadataCache = None, connect_timeout: float = None, sightings: Sightings = None) -> None:
+
+    from .device import DevicePool
+
+    use_sightings(sightings)
+
+    pool = DevicePool(idle_timeout=idle_timeout,
+                      cache=cache, timeout=connect_timeout)
+
+    async def execute(request: dict) -> str:
+
+        # changes of known devices apply to devices which are connected already
+        storage.alias.refresh()
+        mac = request["address"]
+        out = io.StringIO()
+        async with pool.lock(mac):
+            device = await pool.get(mac)
+            if request["command"] == "status":
+                await request_status(device)
+                print_status(device, _json=request.get("json"), file=out)
+
+            elif request["command"] == "info":
+                await request_device_info(device)
+                print_device_info(
+                    device, _json=request.get("json"), file=out)
+
+            elif request["command"] == "configure":
+                configuration = parse_configuration(humidityAlarm=request.get("humidityAlarm"), temperatureAlarm=request.get("temperatureAlarm"),
+                                                    humidityOffset=request.get("humidityOffset"), temperatureOffset=request.get("temperatureOffset"))
+                if configuration is None:
+                    raise ValueError("Parameters of configuration are incorrect")
+
+                if not await apply_configuration(device, configuration):
+                    raise RuntimeError("Configuration has not been acknowledged")
+
+            elif request["command"] == "data":
+                measurements, _ = await request_recorded_data(device, start=request.get("start"), end=request.get("end"), timeout=request.get("timeout", 10.0), history=HistorySync() if request.get("sync") else None, store=MeasurementStore() if request.get("store") else None)
+                print_measurements(
+                    measurements, _json=request.get("json"), file=out, format=request.get("format"))
+
+            else:
+                raise ValueError(f"Unknown command {request['command']}")
+
+            if pool.cache:
+                pool.cache.save()
+
+        return out.getvalue()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+
+        try:
+            request = json.loads(await reader.readline())
+            LOGGER.info(f"{request.get('address')}: received request "
+                        f"{request.get('command')} from client")
+            response = {"output": await execute(request)}
+
+        except Exception as e:
+            LOGGER.error(f"An exception has occured: {str(e)}")
+            response = {"error": str(e)}
+
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+        writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)
+
+    server = await asyncio.start_unix_server(handle, path=path)
+    LOGGER.info(f"Listening for requests on {path}")
+    try:
+        while True:
+            await asyncio.sleep(min(10.0, idle_timeout))
+            await pool.evict()
+            storage.alias.refresh()
+            if sightings:
+                sightings.refresh()
+
+    finally:
+        server.close()
+        await pool.close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+async def daemon_request(path: str, request: dict) -> str:
+
+    # returns None if no daemon is listening on given socket
+    if not hasattr(asyncio, "open_unix_connection") or not os.path.exists(path):
+        return None
+
+    try:
+        reader, writer = await asyncio.open_unix_connection(path)
+
+    except OSError:
+        return None
+
+    writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+
+    if "error" in response:
+        LOGGER.error(f"{request['address']}: {response['error']}")
+        return ""
+
+    return response["output"]
+
+
+def request_daemon(path: str, command: str, label: str, **kwargs) -> bool:
+
+    mac = storage.alias.resolve(label=label)
+    if not mac:
+        return False
+
+    output = asyncio.run(daemon_request(
+        path, dict(command=command, address=mac, **kwargs)))
+    if output is None:
+        return False
+
+    print(output, end="", flush=True)
+    return True
+
+
+def print_stats(filename: str) -> None:
+
+    stats = json.dumps(METRICS.snapshot(), indent=2)
+    if filename == "-":
+        print(stats, file=sys.stderr, flush=True)
+    else:
+        with open(filename, "w") as out:
+            out.write(stats + "\n")
+
+
+def main(argv: 'list[str]') -> None:
+
+    args = None
+    try:
+
+        if not argv:
+            scan()
+
+        else:
+            args = arg_parse(argv)
+
+            if args.log:
+                LOGGER.level = MyLogger.NAMES.index(args.log)
+
+            if args.stats:
+                METRICS.enable()
+
+            if args.trace:
+                TRACER.enable()
+
+            output_format = args.format or ("json" if args.json else "table")
+            cache = MetadataCache(
+                ttl={"config": args.cache_ttl, "info": args.cache_info_ttl}) if args.cache_ttl else None
+            sightings = Sightings(filename=os.path.join(
+                home_directory(), Sightings._SIGHTINGS_FILE)) if args.sightings else None
+            if args.scan:
+                scan(writer=Writer.create(output_format, flush_interval=args.flush_interval, live=True), sightings=sightings)
+
+            elif args.measure:
+                policy = EmissionPolicy(delta=args.delta, min_interval=args.min_interval, heartbeat=args.heartbeat) \
+                    if args.delta is not None or args.min_interval or args.heartbeat else None
+                measure(store=MeasurementStore() if args.store else None,
+                        evict=args.evict, policy=policy, writer=Writer.create(output_format, flush_interval=args.flush_interval, live=True),
+                        queue=ScanQueue(maxsize=args.queue_size, policy=args.drop_policy), sightings=sightings)
+
+            elif not args.address and (args.status or args.info or args.data or args.query or args.set_humidity_alarm or args.set_temperature_alarm or args.set_humidity_offset or args.set_temperature_offset):
+
+                print("This operation requires to pass MAC address or alias",
+                      file=sys.stderr, flush=True)
+
+            elif args.set_humidity_alarm or args.set_temperature_alarm or args.set_humidity_offset or args.set_temperature_offset:
+                configuration = dict(humidityAlarm=args.set_humidity_alarm, temperatureAlarm=args.set_temperature_alarm,
+                                     humidityOffset=args.set_humidity_offset, temperatureOffset=args.set_temperature_offset)
+                if parse_configuration(**configuration) is not None and not request_daemon(args.socket, "configure", args.address[0], **configuration):
+                    asyncio.run(configure_device(label=args.address[0], cache=cache,
+                                connect_timeout=args.connect_timeout, sightings=sightings, **configuration))
+
+            elif args.daemon:
+                asyncio.run(daemon(path=args.socket,
+                            idle_timeout=args.idle_timeout, cache=cache, connect_timeout=args.connect_timeout, sightings=sightings))
+
+            elif args.status:
+                if not request_daemon(args.socket, "status", args.address[0], json=args.json):
+                    asyncio.run(status(label=args.address[0], _json=args.json, cache=cache, connect_timeout=args.connect_timeout, sightings=sightings))
+
+            elif args.data:
+                if len(args.address) > 1 or not request_daemon(args.socket, "data", args.address[0], json=args.json, format=output_format, start=args.start, end=args.end, timeout=args.timeout, sync=args.sync, store=args.store):
+                    asyncio.run(recorded_data(labels=args.address,
+                                start=args.start, end=args.end, _json=args.json, timeout=args.timeout, history=HistorySync() if args.sync else None, store=MeasurementStore() if args.store else None, parallel=args.parallel, writer=Writer.create(output_format, flush_interval=args.flush_interval), cache=cache, connect_timeout=args.connect_timeout, sightings=sightings))
+
+            elif args.query:
+                query(label=args.address[0], start=args.start,
+                      end=args.end, _json=args.json, format=output_format)
+
+            elif not request_daemon(args.socket, "info", args.address[0], json=args.json):
+                asyncio.run(device_info(label=args.address[0], _json=args.json, cache=cache, connect_timeout=args.connect_timeout, sightings=sightings))
+
+    except KeyboardInterrupt:
+        pass
+
+    if args and args.stats:
+        print_stats(args.stats)
+
+    if args and args.trace:
+        TRACER.save(args.trace)
+
+    exit(0)
@@ -0,0 +1,896 @@
+import math
+import struct
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import partial
+
+numpy = False
+
+
+class MyLogger():
+
+    DEBUG = 0
+    INFO = 1
+    WARN = 2
+    ERROR = 3
+
+    LEVELS = {
+        "DEBUG": DEBUG,
+        "INFO": INFO,
+        "WARN": WARN,
+        "ERROR": ERROR
+    }
+
+    NAMES = ["DEBUG", "INFO", "WARN", "ERROR"]
+
+    def __init__(self, level: int) -> None:
+
+        self.level = level
+
+    def isEnabledFor(self, level: int) -> bool:
+
+        return level >= self.level
+
+    def error(self, s: str, *args):
+
+        self.log(MyLogger.ERROR, s, *args)
+
+    def warning(self, s: str, *args):
+
+        self.log(MyLogger.WARN, s, *args)
+
+    def info(self, s: str, *args):
+
+        self.log(MyLogger.INFO, s, *args)
+
+    def debug(self, s: str, *args):
+
+        self.log(MyLogger.DEBUG, s, *args)
+
+    def log(self, level: int, s: str, *args):
+
+        # arguments are formatted only if level is enabled
+        if level >= self.level:
+            print(f"{MyLogger.NAMES[level]}\t{s % args if args else s}",
+                  file=sys.stderr, flush=True)
+
+    @staticmethod
+    def hexstr(ba: bytearray) -> str:
+
+        return ba.hex(" ")
+
+
+LOGGER = MyLogger(level=MyLogger.LEVELS["WARN"])
+
+
+class Measurement():
+
+    INT16_LE = struct.Struct("<hh")
+    INT16_BE = struct.Struct(">hh")
+    UINT32_LE = struct.Struct("<I")
+    UINT16_LE = struct.Struct("<HH")
+
+    __slots__ = ("timestamp", "humidityOffset", "temperatureOffset", "temperatureC",
+                 "relHumidity", "_absHumidity", "_dewPointC", "_steamPressure")
+
+    def __init__(self, timestamp: datetime, temperatureC: float, relHumidity: float, humidityOffset: float = 0, temperatureOffset: float = 0) -> None:
+
+        self.timestamp: datetime = timestamp
+        self.humidityOffset: float = humidityOffset
+        self.temperatureOffset: float = temperatureOffset
+        self.temperatureC: float = temperatureC + temperatureOffset
+        self.relHumidity: float = relHumidity + humidityOffset
+
+        # derived values are computed on first access
+        self._absHumidity: float = None
+        self._dewPointC: float = None
+        self._steamPressure: float = None
+
+    def _derive(self) -> None:
+
+        self._absHumidity, self._dewPointC, self._steamPressure = Measurement.psychrometrics(
+            self.temperatureC, self.relHumidity)
+
+    @property
+    def absHumidity(self) -> float:
+
+        if self._absHumidity is None:
+            self._derive()
+        return self._absHumidity
+
+    @property
+    def dewPointC(self) -> float:
+
+        if self._dewPointC is None:
+            self._derive()
+        return self._dewPointC
+
+    @property
+    def steamPressure(self) -> float:
+
+        if self._steamPressure is None:
+            self._derive()
+        return self._steamPressure
+
+    @property
+    def temperatureF(self) -> float:
+
+        return Measurement.to_fahrenheit(self.temperatureC)
+
+    @property
+    def dewPointF(self) -> float:
+
+        return Measurement.to_fahrenheit(self.dewPointC)
+
+    @staticmethod
+    def psychrometrics(temperatureC: float, relHumidity: float) -> 'tuple[float, float, float]':
+
+        z1 = (7.45 * temperatureC) / (235 + temperatureC)
+        es = 6.1 * math.exp(z1*2.3025851)
+        e = es * relHumidity / 100.0
+        z2 = e / 6.1
+
+        # absolute humidity / g/m3
+        absHumidity = round((216.7 * e) / (273.15 + temperatureC) * 10) / 10.0
+
+        # no dew point without humidity, same NaN as the numpy path of MeasurementBatch
+        if z2 > 0:
+            z3 = 0.434292289 * math.log(z2)
+            dewPointC = int((235 * z3) / (7.45 - z3) * 10) / 10.0
+        else:
+            dewPointC = math.nan
+
+        steamPressure = int(e * 10) / 10.0
+
+        return absHumidity, dewPointC, steamPressure
+
+    @staticmethod
+    def finite(value: float) -> float:
+
+        # JSON has no NaN, e.g. dew point without humidity
+        return round(value, 1) if math.isfinite(value) else None
+
+    @staticmethod
+    def to_fahrenheit(temperatureC: float) -> float:
+        return temperatureC * 9.0/5.0 + 32
+
+    @staticmethod
+    def minutes_since_1970(timestamp: datetime) -> int:
+
+        return int((timestamp - datetime(year=1970, month=1, day=1)).total_seconds() // 60)
+
+    @staticmethod
+    def from_minutes_since_1970(minutes: int) -> datetime:
+
+        return datetime(year=1970, month=1, day=1) + timedelta(minutes=minutes)
+
+    @staticmethod
+    def unpack_h5179_date(byte_data: bytearray):
+        # Date is received as minutes since 1/1/1970
+        mins_since_1970 = Measurement.UINT32_LE.unpack_from(byte_data)
+        return Measurement.from_minutes_since_1970(mins_since_1970[0])
+
+    @staticmethod
+    def twos_complement(n: int, w: int = 16) -> int:
+        """Two's complement integer conversion."""
+        # Courtesy of ThrilleratPlay on Github
+        # Adapted from: https://stackoverflow.com/a/33716541.
+        if n & (1 << (w - 1)):
+            n = n - (1 << w)
+        return n
+
+    @staticmethod
+    def decode_H5179_history_record(bytes: bytearray) -> 'tuple[float, float]':
+
+        # Decode data from Govee 5179
+        # Original courtesy of ThrilleratPlay on Github
+        # https://github.com/Home-Is-Where-You-Hang-Your-Hack/sensor.goveetemp_bt_hci/blob/master/custom_components/govee_ble_hci/govee_advertisement.py#L97
+        temp, hum = Measurement.UINT16_LE.unpack_from(bytes)
+        # Negative temperature stored an two's complement
+        temperature = float(Measurement.twos_complement(temp) / 100.0)
+        relHumidity = float(hum / 100.0)
+        # model = "Govee H5179"
+
+        return temperature, relHumidity
+
+    @staticmethod
+    def unpack_H5179_history_record(bytes: bytearray, timestamp: datetime = None, little_endian=True, humidityOffset: float = 0, temperatureOffset: float = 0) -> 'Measurement':
+
+        temperature, relHumidity = Measurement.decode_H5179_history_record(
+            bytes)
+        return Measurement(timestamp=timestamp, temperatureC=temperature, relHumidity=relHumidity, humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+
+    @staticmethod
+    def decode(bytes: bytearray, little_endian=False) -> 'tuple[float, float]':
+
+        if len(bytes) == 4:
+            temperatureC, relHumidity = Measurement.INT16_LE.unpack(
+                bytes) if little_endian else Measurement.INT16_BE.unpack(bytes)
+            return temperatureC / 100, relHumidity / 100
+
+        elif len(bytes) == 3:
+            return Measurement.decode_raw(int.from_bytes(bytes, "big"))
+
+        else:
+            return None
+
+    @staticmethod
+    def decode_raw(raw: int) -> 'tuple[float, float]':
+
+        # temperature and humidity packed in 3 bytes, sign in highest bit
+        if raw & 0x800000:
+            is_negative = True
+            raw = raw ^ 0x800000
+        else:
+            is_negative = False
+
+        temperatureC = int(raw / 1000) / 10.0
+
+        if is_negative:
+            temperatureC = 0 - temperatureC
+
+        relHumidity = (raw % 1000) / 10.0
+
+        return temperatureC, relHumidity
+
+    @staticmethod
+    def from_bytes(bytes: bytearray, timestamp: datetime = None, little_endian=False, humidityOffset: float = 0, temperatureOffset: float = 0) -> 'Measurement':
+
+        if not timestamp:
+            timestamp = datetime.now()
+
+        values = Measurement.decode(bytes=bytes, little_endian=little_endian)
+        if not values:
+            return None
+
+        temperatureC, relHumidity = values
+        return Measurement(timestamp=timestamp, temperatureC=temperatureC, relHumidity=relHumidity, humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+
+    def __str__(self) -> str:
+
+        s: 'list[str]' = list()
+
+        s.append(f"Timestamp:            "
+                 f"{self.timestamp.strftime('%Y-%m-%d %H:%M')}")
+        s.append(f"Temperature:          "
+                 f"{self.temperatureC:.1f} °C / {self.temperatureF:.1f} °F")
+        if self.temperatureOffset:
+            s.append(f"Temperature offset:   "
+                     f"{self.temperatureOffset:.1f} °C / {Measurement.to_fahrenheit(self.temperatureOffset):.1f} °F")
+        s.append(f"Rel. humidity:        {self.relHumidity:.1f} %")
+
+        if self.humidityOffset:
+            s.append(f"Rel. humidity offset: {self.humidityOffset:.1f} %")
+
+        s.append(f"Dew point:            "
+                 f"{self.dewPointC:.1f} °C / {self.dewPointF:.1f} °F")
+        s.append(f"Abs. humidity:        {self.absHumidity:.1f} g/m³")
+        s.append(f"Steam pressure:       {self.steamPressure:.1f} mbar")
+
+        return "\n".join(s)
+
+    def to_dict(self) -> dict:
+
+        return {
+            "timestamp": self.timestamp.strftime("%Y-%m-%d %H:%M"),
+            "temperatureC": round(self.temperatureC, 1),
+            "temperatureF": round(self.temperatureF, 1),
+            "temperatureOffset": round(self.temperatureOffset, 1),
+            "relHumidity": round(self.relHumidity, 1),
+            "humidityOffset": round(self.humidityOffset, 1),
+            "absHumidity": round(self.absHumidity, 1),
+            "dewPointC": Measurement.finite(self.dewPointC),
+            "dewPointF": Measurement.finite(self.dewPointF),
+            "steamPressure": round(self.steamPressure, 1)
+        }
+
+
+class MeasurementBatch():
+
+    def __init__(self, humidityOffset: float = 0, temperatureOffset: float = 0) -> None:
+
+        self.humidityOffset: float = humidityOffset
+        self.temperatureOffset: float = temperatureOffset
+
+        # raw columns as received from device, i.e. without offsets. Timestamps are kept in minutes since
+        # 1/1/1970 00:00 local time like the device does, so that they don't depend on daylight saving time
+        self.minutes: array = array("q")
+        self.rawTemperatureC: array = array("d")
+        self.rawRelHumidity: array = array("d")
+
+        self._derived: 'dict[str, list[float]]' = None
+
+        # False if transmission of recorded data has been aborted
+        self.complete: bool = True
+
+    @staticmethod
+    def numpy():
+
+        # numpy is optional and slow to import, so it is imported on first use
+        global numpy
+        if numpy is False:
+            try:
+                import numpy
+            except ImportError:
+                numpy = None
+
+        return numpy
+
+    def append(self, timestamp: datetime, temperatureC: float, relHumidity: float) -> None:
+
+        self.minutes.append(Measurement.minutes_since_1970(timestamp))
+        self.rawTemperatureC.append(temperatureC)
+        self.rawRelHumidity.append(relHumidity)
+        self._derived = None
+
+    def extend(self, other: 'MeasurementBatch') -> None:
+
+        self.minutes.extend(other.minutes)
+        self.rawTemperatureC.extend(other.rawTemperatureC)
+        self.rawRelHumidity.extend(other.rawRelHumidity)
+        self._derived = None
+
+    def __len__(self) -> int:
+
+        return len(self.minutes)
+
+    def __getitem__(self, i: int) -> Measurement:
+
+        return Measurement(timestamp=Measurement.from_minutes_since_1970(self.minutes[i]), temperatureC=self.rawTemperatureC[i], relHumidity=self.rawRelHumidity[i], humidityOffset=self.humidityOffset, temperatureOffset=self.temperatureOffset)
+
+    def __iter__(self):
+
+        for i in range(len(self)):
+            yield self[i]
+
+    @staticmethod
+    def psychrometrics(temperatureC: 'list[float]', relHumidity: 'list[float]') -> 'dict[str, list[float]]':
+
+        if MeasurementBatch.numpy():
+            t = numpy.asarray(temperatureC, dtype=numpy.float64)
+            rh = numpy.asarray(relHumidity, dtype=numpy.float64)
+
+            z1 = (7.45 * t) / (235 + t)
+            es = 6.1 * numpy.exp(z1*2.3025851)
+            e = es * rh / 100.0
+            z2 = e / 6.1
+
+            absHumidity = numpy.round((216.7 * e) / (273.15 + t) * 10) / 10.0
+
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                z3 = 0.434292289 * numpy.log(z2)
+                dewPointC = numpy.where(
+                    z2 > 0, numpy.trunc((235 * z3) / (7.45 - z3) * 10) / 10.0, numpy.nan)
+
+            steamPressure = numpy.trunc(e * 10) / 10.0
+
+            return {
+                "temperatureF": Measurement.to_fahrenheit(t).tolist(),
+                "absHumidity": absHumidity.tolist(),
+                "dewPointC": dewPointC.tolist(),
+                "dewPointF": Measurement.to_fahrenheit(dewPointC).tolist(),
+                "steamPressure": steamPressure.tolist()
+            }
+
+        derived = {
+            "temperatureF": [Measurement.to_fahrenheit(t) for t in temperatureC],
+            "absHumidity": array("d"),
+            "dewPointC": array("d"),
+            "dewPointF": array("d"),
+            "steamPressure": array("d")
+        }
+        psychrometrics = Measurement.psychrometrics
+        to_fahrenheit = Measurement.to_fahrenheit
+        for t, rh in zip(temperatureC, relHumidity):
+            absHumidity, dewPointC, steamPressure = psychrometrics(t, rh)
+            derived["absHumidity"].append(absHumidity)
+            derived["dewPointC"].append(dewPointC)
+            derived["dewPointF"].append(to_fahrenheit(dewPointC))
+            derived["steamPressure"].append(steamPressure)
+
+        return derived
+
+    def _derive(self) -> 'dict[str, list[float]]':
+
+        if self._derived is None:
+            temperatureC = array("d", [t + self.temperatureOffset
+                                       for t in self.rawTemperatureC])
+            relHumidity = array("d", [h + self.humidityOffset
+                                      for h in self.rawRelHumidity])
+            self._derived = MeasurementBatch.psychrometrics(
+                temperatureC, relHumidity)
+            self._derived["temperatureC"] = temperatureC
+            self._derived["relHumidity"] = relHumidity
+
+        return self._derived
+
+    @property
+    def temperatureC(self) -> 'list[float]':
+        return self._derive()["temperatureC"]
+
+    @property
+    def relHumidity(self) -> 'list[float]':
+        return self._derive()["relHumidity"]
+
+    @property
+    def temperatureF(self) -> 'list[float]':
+        return self._derive()["temperatureF"]
+
+    @property
+    def absHumidity(self) -> 'list[float]':
+        return self._derive()["absHumidity"]
+
+    @property
+    def dewPointC(self) -> 'list[float]':
+        return self._derive()["dewPointC"]
+
+    @property
+    def dewPointF(self) -> 'list[float]':
+        return self._derive()["dewPointF"]
+
+    @property
+    def steamPressure(self) -> 'list[float]':
+        return self._derive()["steamPressure"]
+
+    def rows(self):
+
+        d = self._derive()
+        from_minutes_since_1970 = Measurement.from_minutes_since_1970
+        return zip((from_minutes_since_1970(minute) for minute in self.minutes), d["temperatureC"], d["dewPointC"], d["temperatureF"], d["dewPointF"], d["relHumidity"], d["absHumidity"], d["steamPressure"])
+
+    def to_dicts(self) -> 'list[dict]':
+
+        return list(self.dicts())
+
+    def dicts(self):
+
+        temperatureOffset = round(self.temperatureOffset, 1)
+        humidityOffset = round(self.humidityOffset, 1)
+        finite = Measurement.finite
+
+        return ({
+            "timestamp": timestamp.strftime("%Y-%m-%d %H:%M"),
+            "temperatureC": round(temperatureC, 1),
+            "temperatureF": round(temperatureF, 1),
+            "temperatureOffset": temperatureOffset,
+            "relHumidity": round(relHumidity, 1),
+            "humidityOffset": humidityOffset,
+            "absHumidity": round(absHumidity, 1),
+            "dewPointC": finite(dewPointC),
+            "dewPointF": finite(dewPointF),
+            "steamPressure": round(steamPressure, 1)
+        } for timestamp, temperatureC, dewPointC, temperatureF, dewPointF, relHumidity, absHumidity, steamPressure in self.rows())
+
+
+class Alarm():
+
+    def __init__(self, active: bool, lower: float, upper: float, unit: str = ""):
+        self.active: bool = active
+        self.lower: float = lower
+        self.upper: float = upper
+        self.unit: str = unit
+
+    @staticmethod
+    def from_bytes(bytes: bytearray, unit: str = None) -> 'Alarm':
+
+        active, lower, upper = struct.unpack("<?hh", bytes)
+        return Alarm(active=active, lower=lower/100.0, upper=upper/100.0, unit=unit)
+
+    def to_bytes(self) -> bytearray:
+
+        return struct.pack("<?hh", self.active, int(self.lower * 100), int(self.upper * 100))
+
+    def __str__(self):
+
+        return "%s, lower threshold: %.1f%s, upper threshold: %.1f%s" % ("active" if self.active else "inactive", self.lower, self.unit, self.upper, self.unit)
+
+    def to_dict(self) -> dict:
+
+        return {
+            "active": self.active,
+            "lower": self.lower,
+            "upper": self.upper
+        }
+
+
+class MacAndSerial():
+
+    def __init__(self, mac: str, serial: int):
+
+        self.mac: str = mac
+        self.serial: int = serial
+
+    @staticmethod
+    def from_bytes(bytes: bytearray) -> 'MacAndSerial':
+
+        mac = list()
+        for i in range(6):
+            m = "0%s" % hex(bytes[5-i]).upper().replace("0X", "")
+            mac.append(m[-2:])
+
+        return MacAndSerial(mac=MacAndSerial.decode_mac(bytes=bytes), serial=struct.unpack("<h", bytes[6:8])[0])
+
+    @staticmethod
+    def decode_mac(bytes: bytearray) -> str:
+
+        mac = list()
+        for i in range(6):
+            m = "0%s" % hex(bytes[5-i]).upper().replace("0X", "")
+            mac.append(m[-2:])
+
+        return ":".join(mac)
+
+    def __str__(self):
+
+        return f"{self.mac}, {self.serial}"
+
+    def to_dict(self) -> dict:
+
+        return {
+            "mac": self.mac,
+            "serial": self.serial
+        }
+
+
+class Codec():
+
+    FRAME_LENGTH = 20
+
+    OPCODE = struct.Struct(">H")
+    OFFSET = struct.Struct("<h")
+    COUNT = struct.Struct(">H")
+
+    def __init__(self) -> None:
+
+        # parameterless commands are encoded only once
+        self._frames: 'dict[tuple[int, int], bytes]' = dict()
+
+        self.decoders: 'dict[int, callable]' = {
+            0xaa01: self.decode_measurement_and_battery,
+            0xaa03: partial(self.decode_alarm, unit=" %"),
+            0xaa04: partial(self.decode_alarm, unit=" °C"),
+            0xaa06: self.decode_offset,
+            0xaa07: self.decode_offset,
+            0xaa08: self.decode_battery,
+            0xaa0a: self.decode_measurement,
+            0xaa0c: self.decode_mac_and_serial,
+            0xaa0d: self.decode_version,
+            0xaa0e: self.decode_version,
+            0xaa0f: self.decode_mac,
+            0xee01: self.decode_count
+        }
+
+    @staticmethod
+    def opcode(frame: bytearray) -> int:
+
+        return frame[0] << 8 | frame[1]
+
+    @staticmethod
+    def checksum(frame: bytearray) -> int:
+
+        _checksum = 0
+        for _b in frame:
+            _checksum ^= _b
+
+        return _checksum
+
+    @staticmethod
+    def valid(frame: bytearray) -> bool:
+
+        if len(frame) != Codec.FRAME_LENGTH:
+            return True
+
+        view = memoryview(frame)
+        return Codec.checksum(view[:-1]) == view[-1]
+
+    def encode(self, command: bytearray, params: bytearray = None, length: int = FRAME_LENGTH) -> bytes:
+
+        if params:
+            return Codec._encode(command, params, length)
+
+        key = (Codec.opcode(command), length)
+        frame = self._frames.get(key)
+        if frame is None:
+            frame = self._frames[key] = Codec._encode(command, None, length)
+
+        return frame
+
+    @staticmethod
+    def _encode(command: bytearray, params: bytearray, length: int) -> bytes:
+
+        _bytearray = bytearray(command)
+        if params:
+            _bytearray.extend(params)
+
+        # frames are zero padded and end with the XOR checksum of all bytes
+        if len(_bytearray) < length:
+            _bytearray.extend(bytes(length - 1 - len(_bytearray)))
+            _bytearray.append(Codec.checksum(_bytearray))
+
+        return bytes(_bytearray)
+
+    def decode(self, frame: bytearray) -> 'tuple[int, object]':
+
+        if len(frame) < 2 or not Codec.valid(frame):
+            return None
+
+        view = memoryview(frame)
+        opcode = Codec.OPCODE.unpack_from(view)[0]
+        decoder = self.decoders.get(opcode)
+        return opcode, decoder(view) if decoder else None
+
+    @staticmethod
+    def decode_alarm(view: memoryview, unit: str = None) -> Alarm:
+
+        return Alarm.from_bytes(view[2:7], unit=unit)
+
+    @staticmethod
+    def decode_offset(view: memoryview) -> float:
+
+        return Codec.OFFSET.unpack_from(view, 2)[0] / 100.0
+
+    @staticmethod
+    def decode_battery(view: memoryview) -> int:
+
+        return view[2]
+
+    @staticmethod
+    def decode_measurement(view: memoryview) -> 'tuple[float, float]':
+
+        return Measurement.decode(bytes=view[2:6], little_endian=True)
+
+    @staticmethod
+    def decode_measurement_and_battery(view: memoryview) -> 'tuple[float, float, int]':
+
+        temperatureC, relHumidity = Measurement.decode(
+            bytes=view[2:6], little_endian=False)
+        return temperatureC, relHumidity, view[6]
+
+    @staticmethod
+    def decode_mac_and_serial(view: memoryview) -> MacAndSerial:
+
+        return MacAndSerial.from_bytes(view[2:10])
+
+    @staticmethod
+    def decode_version(view: memoryview) -> str:
+
+        return view[2:9].tobytes().decode()
+
+    @staticmethod
+    def decode_mac(view: memoryview) -> str:
+
+        return MacAndSerial.decode_mac(view[2:8])
+
+    @staticmethod
+    def decode_count(view: memoryview) -> int:
+
+        return Codec.COUNT.unpack_from(view, 2)[0]
+
+    @staticmethod
+    def decode_records_H507x(frame: bytearray) -> 'tuple[int, list[tuple[int, float, float]]]':
+
+        # minutes in the past of the first record and up to 6 records of 3 bytes
+        view = memoryview(frame)
+        minutes_back = Codec.COUNT.unpack_from(view)[0]
+        return minutes_back, [(i, *Measurement.decode(bytes=view[2 + 3 * i:5 + 3 * i])) for i in range(6) if view[2 + 3 * i] != 0xff]
+
+    @staticmethod
+    def decode_records_H5179(frame: bytearray) -> 'tuple[datetime, list[tuple[int, float, float]]]':
+
+        # minutes since 1970 of the first record and up to 4 records of 4 bytes
+        view = memoryview(frame)
+        record_time = Measurement.unpack_h5179_date(view)
+        return record_time, [(i, *Measurement.decode_H5179_history_record(view[4 + 4 * i:8 + 4 * i])) for i in range(4) if view[4 + 4 * i] != 0xff]
+
+
+class AdvertisementDecoder():
+
+    MAC_PREFIX = ("A4:C1:38:", "1C:9F:24:")
+
+    MANUFACTURER_H507X = 0xec88
+    MANUFACTURER_H5179 = 0x8801
+
+    H5075 = struct.Struct(">I")
+    H5074 = struct.Struct("<xhhB")
+    H5179 = struct.Struct("<4xhHB")
+
+    def __init__(self, offsets: 'dict[str, tuple[float, float]]' = None) -> None:
+
+        # humidity and temperature offsets by address
+        self.offsets: 'dict[str, tuple[float, float]]' = offsets if offsets is not None else dict()
+
+        # model and offsets of each address seen, None if it isn't a thermometer
+        self.devices: 'dict[str, tuple[str, float, float]]' = dict()
+
+        self.decoders: 'dict[str, tuple[int, callable]]' = {
+            "H5074": (AdvertisementDecoder.MANUFACTURER_H507X, AdvertisementDecoder.decode_H5074),
+            "H5075": (AdvertisementDecoder.MANUFACTURER_H507X, AdvertisementDecoder.decode_H5075),
+            "H5179": (AdvertisementDecoder.MANUFACTURER_H5179, AdvertisementDecoder.decode_H5179)
+        }
+
+    @staticmethod
+    def decode_H5075(data: bytes) -> 'tuple[float, float, int]':
+
+        if len(data) < 5:
+            return None
+
+        temperatureC, relHumidity = Measurement.decode_raw(
+            AdvertisementDecoder.H5075.unpack_from(data)[0] & 0xffffff)
+        return temperatureC, relHumidity, data[4]
+
+    @staticmethod
+    def decode_H5074(data: bytes) -> 'tuple[float, float, int]':
+
+        if len(data) < AdvertisementDecoder.H5074.size:
+            return None
+
+        temperatureC, relHumidity, battery = AdvertisementDecoder.H5074.unpack_from(
+            data)
+        return round(temperatureC / 100, 1), round(relHumidity / 100, 1), battery
+
+    @staticmethod
+    def decode_H5179(data: bytes) -> 'tuple[float, float, int]':
+
+        # Courtesy of ThrilleratPlay on Github
+        # https://github.com/Home-Is-Where-You-Hang-Your-Hack/sensor.goveetemp_bt_hci/blob/master/custom_components/govee_ble_hci/govee_advertisement.py#L97
+        if len(data) < AdvertisementDecoder.H5179.size:
+            return None
+
+        temperatureC, relHumidity, battery = AdvertisementDecoder.H5179.unpack_from(
+            data)
+        return temperatureC / 100.0, relHumidity / 100.0, battery
+
+    def model(self, address: str, name: str, manufacturer_data: dict) -> str:
+
+        if not name or address.upper()[0:9] not in AdvertisementDecoder.MAC_PREFIX:
+            return None
+
+        if AdvertisementDecoder.MANUFACTURER_H507X in manufacturer_data:
+            return "H5074" if "H5074" in name else "H5075"
+
+        return "H5179"
+
+    def device(self, address: str, name: str, manufacturer_data: dict) -> 'tuple[str, float, float]':
+
+        model = self.model(address, name, manufacturer_data)
+        if not model:
+            return None
+
+        # H5074 and H5179 are reported without offsets
+        humidityOffset, temperatureOffset = self.offsets.get(
+            address, (0.0, 0.0)) if model == "H5075" else (0.0, 0.0)
+
+        device = (model, humidityOffset, temperatureOffset)
+        self.devices[address] = device
+        return device
+
+    def decode(self, address: str, name: str, manufacturer_data: dict) -> 'tuple[int, Measurement]':
+
+        if AdvertisementDecoder.MANUFACTURER_H507X not in manufacturer_data and AdvertisementDecoder.MANUFACTURER_H5179 not in manufacturer_data:
+            return None
+
+        device = self.devices.get(address)
+        if not device:
+            # devices without name aren't cached since a later advertisement may have one
+            device = self.device(address, name, manufacturer_data)
+            if not device:
+                return None
+
+        model, humidityOffset, temperatureOffset = device
+        manufacturer_id, decoder = self.decoders[model]
+        data = manufacturer_data.get(manufacturer_id)
+        values = decoder(data) if data else None
+        if not values:
+            return None
+
+        temperatureC, relHumidity, battery = values
+        return battery, Measurement(datetime.now(), temperatureC, relHumidity, humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+
+    def forget(self, address: str) -> None:
+
+        self.devices.pop(address, None)
+
+    def reset(self) -> None:
+
+        self.devices.clear()
+
+
+class LatestReadings():
+
+    def __init__(self, max_age: float = None, clock=time.monotonic) -> None:
+
+        # seconds after which devices which haven't been seen anymore are evicted
+        self.max_age: float = max_age
+        self.clock = clock
+        self.on_evict: 'list[callable]' = list()
+        self.evicted: int = 0
+
+        # least recently seen device first
+        self.readings: 'OrderedDict[str, tuple[float, str, int, Measurement]]' = OrderedDict()
+
+    def __contains__(self, address: str) -> bool:
+
+        return address in self.readings
+
+    def __len__(self) -> int:
+
+        return len(self.readings)
+
+    def get(self, address: str) -> 'tuple[str, int, Measurement]':
+
+        reading = self.readings.get(address)
+        return reading[1:] if reading else None
+
+    def update(self, address: str, name: str, battery: int, measurement: Measurement) -> None:
+
+        now = self.clock()
+        self.readings[address] = (now, name, battery, measurement)
+        self.readings.move_to_end(address)
+        if self.max_age:
+            self.evict(now)
+
+    def evict(self, now: float = None) -> None:
+
+        if now is None:
+            now = self.clock()
+
+        while self.readings:
+            address, reading = next(iter(self.readings.items()))
+            if now - reading[0] <= self.max_age:
+                break
+
+            self.readings.popitem(last=False)
+            self.evicted += 1
+            for on_evict in self.on_evict:
+                on_evict(address)
+
+
+class EmissionPolicy():
+
+    def __init__(self, delta: float = None, min_interval: float = None, heartbeat: float = None, clock=time.monotonic) -> None:
+
+        # minimal change of temperature or humidity, seconds between two emits and seconds after which is emitted anyway
+        self.delta: float = delta
+        self.min_interval: float = min_interval
+        self.heartbeat: float = heartbeat
+        self.clock = clock
+
+        self.emitted: int = 0
+        self.suppressed: int = 0
+
+        # time, temperature and humidity of the last emitted measurement of each device
+        self.last: 'dict[str, tuple[float, float, float]]' = dict()
+
+    def accept(self, address: str, measurement: Measurement) -> bool:
+
+        now = self.clock()
+        last = self.last.get(address)
+        if last and not self._due(now, last, measurement):
+            self.suppressed += 1
+            return False
+
+        self.last[address] = (
+            now, measurement.temperatureC, measurement.relHumidity)
+        self.emitted += 1
+        return True
+
+    def _due(self, now: float, last: 'tuple[float, float, float]', measurement: Measurement) -> bool:
+
+        elapsed = now - last[0]
+        if self.min_interval and elapsed < self.min_interval:
+            return False
+
+        if self.heartbeat and elapsed >= self.heartbeat:
+            return True
+
+        if self.delta is not None:
+            return abs(measurement.temperatureC - last[1]) > self.delta or abs(measurement.relHumidity - last[2]) > self.delta
+
+        return True
+
+    def forget(self, address: str) -> None:
+
+        self.last.pop(address, None)
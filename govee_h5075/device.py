@@ -0,0 +1,950 @@
+import asyncio
+import math
+import random
+import struct
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from typing import AsyncIterator
+
+from bleak import AdvertisementData, BleakClient, BleakScanner, BLEDevice
+from bleak.exc import BleakError
+
+from . import storage
+from .core import LOGGER, AdvertisementDecoder, Alarm, Codec, LatestReadings, MacAndSerial, Measurement, MeasurementBatch, MyLogger
+from .flow import DataControl, ScanQueue
+from .metrics import METRICS
+from .trace import TRACER
+from .storage import MetadataCache, Sightings
+
+
+class GoveeThermometerHygrometer(BleakClient):
+
+    MAC_PREFIX = AdvertisementDecoder.MAC_PREFIX
+
+    UUID_NAME = "00002a00-0000-1000-8000-00805f9b34fb"
+    UUID_DEVICE = "494e5445-4c4c-495f-524f-434b535f2011"
+    UUID_COMMAND = "494e5445-4c4c-495f-524f-434b535f2012"
+    UUID_DATA = "494e5445-4c4c-495f-524f-434b535f2013"
+
+    REQUEST_CURRENT_MEASUREMENT = bytearray([0xaa, 0x01])
+    REQUEST_CURRENT_MEASUREMENT2 = bytearray([0xaa, 0x0a])
+
+    REQUEST_ALARM_HUMIDTY = bytearray([0xaa, 0x03])
+    REQUEST_ALARM_TEMPERATURE = bytearray([0xaa, 0x04])
+    REQUEST_OFFSET_HUMIDTY = bytearray([0xaa, 0x06])
+    REQUEST_OFFSET_TEMPERATURE = bytearray([0xaa, 0x07])
+    REQUEST_BATTERY_LEVEL = bytearray([0xaa, 0x08])
+    REQUEST_MAC_AND_SERIAL = bytearray([0xaa, 0x0c])
+    REQUEST_HARDWARE = bytearray([0xaa, 0x0d])
+    REQUEST_FIRMWARE = bytearray([0xaa, 0x0e])
+    REQUEST_MAC_ADDRESS = bytearray([0xaa, 0x0f])
+
+    SEND_RECORDS_H5179_TX_REQUEST = bytearray([0x00, 0x00])
+    SEND_RECORDS_TX_REQUEST = bytearray([0x33, 0x01])
+    SEND_ALARM_HUMIDTY = bytearray([0x33, 0x03])
+    SEND_ALARM_TEMPERATURE = bytearray([0x33, 0x04])
+    SEND_OFFSET_HUMIDTY = bytearray([0x33, 0x06])
+    SEND_OFFSET_TEMPERATURE = bytearray([0x33, 0x07])
+
+    RECORDS_TX_COMPLETED = bytearray([0xee, 0x01])
+
+    # seconds to wait for the response of a request
+    RESPONSE_TIMEOUT = 5.0
+
+    # seconds to wait for a connection, number of retries and seconds before first retry
+    CONNECT_TIMEOUT = 10.0
+    CONNECT_RETRIES = 2
+    CONNECT_BACKOFF = 1.0
+
+    # devices seen by scans of this process
+    sightings: Sightings = Sightings()
+
+    CODEC = Codec()
+
+    def __init__(self, address, disconnected_callback=None, cache: MetadataCache = None, timeout: float = None, retries: int = None) -> None:
+
+        # devices which have been seen recently are connected without discovering them again
+        self.ble_device: BLEDevice = GoveeThermometerHygrometer.sightings.get(
+            address) if isinstance(address, str) else None
+        super().__init__(self.ble_device or address, disconnected_callback=disconnected_callback,
+                         timeout=timeout or GoveeThermometerHygrometer.CONNECT_TIMEOUT)
+        self.retries: int = retries if retries is not None else GoveeThermometerHygrometer.CONNECT_RETRIES
+
+        # device information and configuration are taken from cache if available
+        self.cache: MetadataCache = cache
+
+        self.deviceName: str = None
+        self.manufacturer: str = None
+        self.model: str = None
+        self.hardware: str = None
+        self.firmware: str = None
+        self.macAndSerial: MacAndSerial = None
+        self.mac: str = None
+        self.batteryLevel: int = None
+
+        self.humidityAlarm: Alarm = None
+        self.temperatureAlarm: Alarm = None
+        self.humidityOffset: float = 0
+        self.temperatureOffset: float = 0
+        self.measurement: Measurement = None
+
+        self._data_control: DataControl = None
+
+        # futures of requests which wait for a response with the same opcode
+        self._pending: 'dict[int, list[asyncio.Future]]' = dict()
+
+        self._handlers: 'dict[int, callable]' = {
+            0xaa01: self._on_measurement_and_battery,
+            0xaa03: partial(self._on_value, "humidityAlarm", "configuration for humidity alarm"),
+            0xaa04: partial(self._on_value, "temperatureAlarm", "configuration for temperature alarm"),
+            0xaa06: partial(self._on_value, "humidityOffset", "configuration for humidity offset"),
+            0xaa07: partial(self._on_value, "temperatureOffset", "configuration for temperature offset"),
+            0xaa08: partial(self._on_value, "batteryLevel", "battery level"),
+            0xaa0a: self._on_measurement,
+            0xaa0c: partial(self._on_value, "macAndSerial", "mac address and serial"),
+            0xaa0d: partial(self._on_value, "hardware", "hardware version"),
+            0xaa0e: partial(self._on_value, "firmware", "firmware version"),
+            0xaa0f: partial(self._on_value, "mac", "mac address"),
+            0x3301: self._on_transfer_started,
+            0x3303: partial(self._on_acknowledge, "humidityAlarm", "humidity alarm"),
+            0x3304: partial(self._on_acknowledge, "temperatureAlarm", "temperature alarm"),
+            0x3306: partial(self._on_acknowledge, "humidityOffset", "humidity offset"),
+            0x3307: partial(self._on_acknowledge, "temperatureOffset", "temperature offset"),
+            0xee01: self._on_transfer_completed
+        }
+
+    @classmethod
+    async def open(cls, address: str, **kwargs) -> 'GoveeThermometerHygrometer':
+
+        # connected client, if the device of a former scan can't be connected anymore another client discovers it
+        device = cls(address, **kwargs)
+        try:
+            await device.connect()
+
+        except (BleakError, asyncio.TimeoutError):
+            if not device.ble_device:
+                raise
+
+            LOGGER.info(f"{device.address}: discover device again")
+            device = cls(address, **kwargs)
+            await device.connect()
+
+        return device
+
+    async def connect(self) -> None:
+
+        async def notification_handler_device(device: BLEDevice, bytes: bytearray) -> None:
+
+            if LOGGER.isEnabledFor(MyLogger.DEBUG):
+                LOGGER.debug("%s: <<< received notification with device data(%s)",
+                             self.address, MyLogger.hexstr(bytes))
+
+            self.dispatch(bytes)
+
+        async def notification_handler_data(device: BLEDevice, bytes: bytearray) -> None:
+
+            data_control = self._data_control
+            METRICS.count("history.notifications")
+            started = TRACER.clock() if TRACER.enabled else None
+            self.receive_records(bytes)
+            if started is not None:
+                TRACER.complete(self.address, "notification data",
+                                started, args={"size": len(bytes)})
+
+            if data_control and data_control.queue:
+                await data_control.forward()
+
+        async def notification_handler_command(device: BLEDevice, bytes: bytearray) -> None:
+
+            if LOGGER.isEnabledFor(MyLogger.DEBUG):
+                LOGGER.debug("%s: <<< received notification after command (%s)",
+                             self.address, MyLogger.hexstr(bytes))
+
+            self.dispatch(bytes)
+
+        LOGGER.info(f"{self.address}: Request to connect")
+        with METRICS.timer("connect"), TRACER.span(self.address, "connect", args={"cached": self.ble_device is not None}):
+            attempt = 0
+            while True:
+                try:
+                    await super().connect()
+                    break
+
+                except (BleakError, asyncio.TimeoutError) as e:
+                    if self.ble_device:
+                        # BlueZ may have forgotten the device since it has been seen. Sighting is forgotten so
+                        # that a new client discovers the device by its address, see open()
+                        LOGGER.info(f"{self.address}: connecting to device of former scan has failed "
+                                    f"({str(e) or type(e).__name__})")
+                        METRICS.count("connect.stale")
+                        GoveeThermometerHygrometer.sightings.forget(self.address)
+                        raise
+
+                    if attempt == self.retries:
+                        METRICS.count("connect.failed")
+                        raise
+
+                    # jitter keeps retries of several devices apart
+                    delay = GoveeThermometerHygrometer.CONNECT_BACKOFF * \
+                        2 ** attempt * random.uniform(0.5, 1.5)
+                    LOGGER.warning(f"{self.address}: connecting has failed ({str(e) or type(e).__name__}), "
+                                   f"retry in {delay:.1f} seconds")
+                    METRICS.count("connect.retries")
+                    await asyncio.sleep(delay)
+                    attempt += 1
+
+        if self.is_connected:
+            LOGGER.info(f"{self.address}: Successfully connected")
+            LOGGER.debug(f'{self.address}: Start listening for notifications for device data on UUID '
+                         f'{self.UUID_DEVICE}')
+            await self.start_notify(self.UUID_DEVICE, callback=notification_handler_device)
+            LOGGER.debug(f'{self.address}: Start listening for notifications for commands on UUID '
+                         f'{self.UUID_COMMAND}')
+            await self.start_notify(self.UUID_COMMAND, callback=notification_handler_command)
+            LOGGER.debug(f'{self.address}: Start listening for notifications for data on UUID '
+                         f'{self.UUID_DATA}')
+            await self.start_notify(self.UUID_DATA, callback=notification_handler_data)
+            await asyncio.sleep(.2)
+        else:
+            LOGGER.error(f"{self.address}: Connecting has failed")
+            METRICS.count("connect.failed")
+
+    async def start_notify(self, char_specifier, callback, **kwargs) -> None:
+
+        with METRICS.timer("start_notify"), TRACER.span(self.address, "start_notify", args={"uuid": str(char_specifier)}):
+            await super().start_notify(char_specifier, callback, **kwargs)
+
+    async def disconnect(self) -> None:
+
+        LOGGER.info(f"{self.address}: Request to disconnect")
+        if self.cache:
+            self.cache.save()
+
+        if self.is_connected:
+            await super().disconnect()
+            LOGGER.info(f"{self.address}: Successfully disconnected")
+
+    async def write_H5179_hist_gatt_char_command(self, uuid: str, command: bytearray, start: int = None, end: int = None) -> None:
+
+        # H5179 command is the command + start time and end time in minutes since 1/1/1970 00:00
+        params = start.to_bytes(4, byteorder="little") + \
+            end.to_bytes(4, byteorder="little") if start and end else None
+        _bytes = GoveeThermometerHygrometer.CODEC.encode(
+            command, params=params, length=10)
+
+        if LOGGER.isEnabledFor(MyLogger.DEBUG):
+            LOGGER.debug("%s: >>> write_gatt_char(%s, %s)",
+                         self.address, uuid, MyLogger.hexstr(_bytes))
+
+        opcode = Codec.opcode(command)
+        with METRICS.timer(f"write.{opcode:04x}"), TRACER.span(self.address, f"write {opcode:04x}", args={"uuid": uuid, "size": len(_bytes)}, overlap=True):
+            await self.write_gatt_char(uuid, _bytes, response=True)
+
+    async def write_gatt_char_command(self, uuid: str, command: bytearray, params: bytearray = None) -> None:
+
+        if not uuid or not command:
+            return None
+
+        _bytes = GoveeThermometerHygrometer.CODEC.encode(command, params=params)
+
+        if LOGGER.isEnabledFor(MyLogger.DEBUG):
+            LOGGER.debug("%s: >>> write_gatt_char(%s, %s)",
+                         self.address, uuid, MyLogger.hexstr(_bytes))
+
+        opcode = Codec.opcode(command)
+        with METRICS.timer(f"write.{opcode:04x}"), TRACER.span(self.address, f"write {opcode:04x}", args={"uuid": uuid, "size": len(_bytes)}, overlap=True):
+            await self.write_gatt_char(uuid, _bytes, response=True)
+
+    def receive_records(self, frame: bytearray) -> None:
+
+        if LOGGER.isEnabledFor(MyLogger.DEBUG):
+            LOGGER.debug("%s: <<< received notification with measurement data (%s)",
+                         self.address, MyLogger.hexstr(frame))
+
+        if not self._data_control:
+            return
+
+        # records of H5179 go back in time, records of H507* forth
+        if self._data_control.device_category == "H5179":
+            timestamp, records = Codec.decode_records_H5179(frame)
+            step = -1
+        else:  # default to H507*
+            minutes_back, records = Codec.decode_records_H507x(frame)
+            timestamp = self._data_control.timestamp - \
+                timedelta(minutes=minutes_back)
+            step = 1
+
+        for i, temperatureC, relHumidity in records:
+            record_time = timestamp + timedelta(minutes=step * i)
+            if LOGGER.isEnabledFor(MyLogger.DEBUG):
+                LOGGER.debug("%s: Time: %s temperature=%.1f °C, humidity=%.1f %%", self.address,
+                             record_time, temperatureC + self.temperatureOffset, relHumidity + self.humidityOffset)
+
+            self._data_control.measurements.append(
+                record_time, temperatureC, relHumidity)
+
+        self._data_control.count()
+
+    def dispatch(self, frame: bytearray) -> None:
+
+        started = TRACER.clock() if TRACER.enabled else None
+        decoded = GoveeThermometerHygrometer.CODEC.decode(frame)
+        if not decoded:
+            LOGGER.warning(f"{self.address}: dropped notification with invalid checksum ("
+                           f"{MyLogger.hexstr(frame)})")
+            return
+
+        opcode, value = decoded
+        handler = self._handlers.get(opcode)
+        if handler:
+            handler(value)
+
+        self._resolve(opcode)
+        if started is not None:
+            TRACER.complete(self.address, f"notification {opcode:04x}", started, args={
+                            "opcode": f"{opcode:04x}", "size": len(frame)})
+
+    def _on_value(self, attribute: str, description: str, value) -> None:
+
+        setattr(self, attribute, value)
+        LOGGER.info(f"{self.address}: received {description}: {str(value)}")
+        if self.cache:
+            self.cache.put(self.address, attribute, value)
+
+    def _on_acknowledge(self, attribute: str, description: str, value) -> None:
+
+        LOGGER.info(f"{self.address}: configuration for {description} successful")
+        if self.cache:
+            self.cache.invalidate(self.address, attribute)
+
+    def _cached(self, *attributes: str) -> bool:
+
+        # takes attributes from cache if all of them are cached
+        values = [self.cache.get(self.address, attribute)
+                  for attribute in attributes] if self.cache else [None]
+        if any(value is None for value in values):
+            return False
+
+        for attribute, value in zip(attributes, values):
+            setattr(self, attribute, value)
+
+        LOGGER.info(f"{self.address}: cached {', '.join(attributes)}: "
+                    f"{', '.join(str(value) for value in values)}")
+        return True
+
+    def _on_measurement(self, value: 'tuple[float, float]') -> None:
+
+        temperatureC, relHumidity = value
+        self.measurement = Measurement(timestamp=datetime.now(), temperatureC=temperatureC, relHumidity=relHumidity,
+                                       humidityOffset=self.humidityOffset or 0, temperatureOffset=self.temperatureOffset or 0)
+        LOGGER.info(f'{self.address}: received current measurement:\n'
+                    f'{str(self.measurement)}')
+
+    def _on_measurement_and_battery(self, value: 'tuple[float, float, int]') -> None:
+
+        temperatureC, relHumidity, self.batteryLevel = value
+        self.measurement = Measurement(timestamp=datetime.now(), temperatureC=temperatureC, relHumidity=relHumidity,
+                                       humidityOffset=self.humidityOffset or 0, temperatureOffset=self.temperatureOffset or 0)
+        LOGGER.info(f'{self.address}: received current measurement and battery level:\n'
+                    f'{str(self.measurement)}\nBattery level:        {self.batteryLevel} %')
+
+    def _on_transfer_started(self, value) -> None:
+
+        if self._data_control:
+            LOGGER.info(f"{self.address}: Data transmission starts")
+            TRACER.instant(self.address, "transfer started")
+            self._data_control.status = DataControl.DATA_CONTROL_STARTED
+            self._data_control.touch()
+
+    def _on_transfer_completed(self, received_msg: int) -> None:
+
+        if not self._data_control:
+            return
+
+        self._data_control.received_msg = received_msg
+        TRACER.instant(self.address, "transfer completed", args={
+                       "received": received_msg, "counted": self._data_control.counted_msg})
+        if self._data_control.received_msg == self._data_control.counted_msg:
+            LOGGER.info(f"{self.address}: Data transmission completed")
+            self._data_control.complete(DataControl.DATA_CONTROL_COMPLETE)
+        else:
+            LOGGER.info(f"{self.address}: Data transmission aborted")
+            self._data_control.complete(DataControl.DATA_CONTROL_INCOMPLETE)
+
+    def _resolve(self, opcode: int) -> None:
+
+        futures = self._pending.get(opcode)
+        while futures:
+            future = futures.pop(0)
+            if not future.done():
+                future.set_result(True)
+                return
+
+    async def request(self, uuid: str, command: bytearray, params: bytearray = None, timeout: float = None) -> bool:
+
+        # writes command and waits for the notification with the same opcode
+        opcode = Codec.opcode(command)
+        future = asyncio.get_running_loop().create_future()
+        futures = self._pending.setdefault(opcode, list())
+        futures.append(future)
+
+        started = time.perf_counter()
+        try:
+            await self.write_gatt_char_command(uuid=uuid, command=command, params=params)
+            await asyncio.wait_for(future, timeout=timeout or GoveeThermometerHygrometer.RESPONSE_TIMEOUT)
+            METRICS.observe(f"request.{opcode:04x}",
+                            time.perf_counter() - started)
+            TRACER.interval(self.address, f"request {opcode:04x}", started)
+            return True
+
+        except asyncio.TimeoutError:
+            METRICS.count("request.timeout")
+            TRACER.interval(self.address, f"request {opcode:04x}", started, args={
+                            "timeout": True})
+            LOGGER.warning(f"{self.address}: no response for request "
+                           f"{MyLogger.hexstr(command[0:2])} within {timeout or GoveeThermometerHygrometer.RESPONSE_TIMEOUT:.1f} seconds")
+            return False
+
+        finally:
+            if future in futures:
+                futures.remove(future)
+            if not futures:
+                self._pending.pop(opcode, None)
+
+    async def read_gatt_char_as_str(self, uuid: str) -> str:
+
+        if not uuid:
+            return None
+
+        LOGGER.debug(f"{self.address}: >>> read_gatt_char("
+                     f"{GoveeThermometerHygrometer.UUID_NAME})")
+        bytes = await super().read_gatt_char(GoveeThermometerHygrometer.UUID_NAME)
+
+        if not bytes:
+            LOGGER.debug(f"{self.address}: <<< no response data received")
+            return None
+        else:
+            LOGGER.debug(
+                f"{self.address}: <<< response data({MyLogger.hexstr(bytes)})")
+            return bytes.decode().replace("\u0000", "")
+
+    async def requestRecordedData(self, start: int, end: int,  device_type: str = "H5075", timeout: float = 10.0, progress=None, queue: asyncio.Queue = None, max_pending: int = None) -> MeasurementBatch:
+
+        device_category = DataControl.get_device_category(device_type)
+
+        if device_category == "H5179":
+            records_per_msg = 4
+            LOGGER.info(f"{self.address}: request recorded measurements from "
+                        f"{start} to {end} minutes since 1/1/1970 00:00")
+        else:
+            records_per_msg = 6
+            LOGGER.info(f"{self.address}: request recorded measurements from "
+                        f"{start} to {end} minutes in the past")
+
+        self._data_control = DataControl(
+            expected_msg=math.ceil((abs(start - end) + 1) / records_per_msg), humidityOffset=self.humidityOffset, temperatureOffset=self.temperatureOffset, progress=progress, queue=queue, max_pending=max_pending)
+        data_control = self._data_control
+        traced = TRACER.clock()
+        # Now set the device category
+        data_control.set_device_category(device_type)
+
+        try:
+            # Special case for 5179
+            if device_category == "H5179":
+                # H5179
+                await self.write_H5179_hist_gatt_char_command(uuid=GoveeThermometerHygrometer.UUID_COMMAND, command=GoveeThermometerHygrometer.SEND_RECORDS_H5179_TX_REQUEST, start=start, end=end)
+            else:
+                # Default to H507*
+                await self.write_gatt_char_command(uuid=GoveeThermometerHygrometer.UUID_COMMAND, command=GoveeThermometerHygrometer.SEND_RECORDS_TX_REQUEST, params=[start >> 8, start & 0xff, end >> 8, end & 0xff])
+
+            # timeout is reset by every notification, i.e. long transfers are fine as long as data is flowing
+            while not data_control.completed.is_set():
+                idle = data_control.idle()
+                if idle >= timeout:
+                    LOGGER.warning(f"{self.address}: No data received for "
+                                   f"{timeout:.1f} seconds, data transmission aborted")
+                    data_control.status = DataControl.DATA_CONTROL_INCOMPLETE
+                    break
+
+                try:
+                    await asyncio.wait_for(data_control.completed.wait(), timeout=timeout - idle)
+                except asyncio.TimeoutError:
+                    pass
+
+        finally:
+            if self._data_control is data_control:
+                self._data_control = None
+
+        complete = data_control.status == DataControl.DATA_CONTROL_COMPLETE and not data_control.overflow
+        if data_control.overflow:
+            LOGGER.warning(f"{self.address}: consumer has fallen behind, "
+                           f"{data_control.overflow} records dropped")
+            METRICS.count("history.dropped", data_control.overflow)
+
+        TRACER.complete(self.address, "recorded data", traced, args={
+                        "start": start, "end": end, "messages": data_control.counted_msg, "complete": complete})
+        if METRICS.enabled:
+            records = data_control.records + len(data_control.measurements)
+            duration = data_control.last_activity - data_control.started
+            METRICS.count("history.complete" if complete else "history.incomplete")
+            METRICS.count("history.records", records)
+            METRICS.observe("history.transfer", duration)
+            if duration > 0:
+                METRICS.observe("history.notifications_per_second",
+                                data_control.counted_msg / duration)
+                METRICS.observe("history.records_per_second", records / duration)
+
+        if queue:
+            # last batch carries the status of the transfer and is followed by None
+            data_control.pending.append(data_control.take())
+            data_control.pending[-1].complete = complete
+            data_control.pending.append(None)
+            await data_control.forward()
+
+        measurements = data_control.measurements
+        measurements.complete = complete
+        return measurements
+
+    async def iterRecordedData(self, start: int, end: int,  device_type: str = "H5075", timeout: float = 10.0, progress=None, maxsize: int = 16, max_pending: int = 1024) -> 'AsyncIterator[MeasurementBatch]':
+
+        # yields a batch per received message while the transfer is running. Only the last batch
+        # tells if the transfer has been complete. At most maxsize batches are waiting for the consumer.
+        # The device can't be paused, so at most max_pending further batches are buffered. If the consumer
+        # falls behind even more, the oldest batches are dropped and the transfer is incomplete.
+        queue = asyncio.Queue(maxsize=maxsize)
+        request = asyncio.ensure_future(self.requestRecordedData(
+            start=start, end=end, device_type=device_type, timeout=timeout, progress=progress, queue=queue, max_pending=max_pending))
+
+        try:
+            while True:
+                get = asyncio.ensure_future(queue.get())
+                await asyncio.wait((get, request), return_when=asyncio.FIRST_COMPLETED)
+                if not get.done():
+                    if request.exception():
+                        get.cancel()
+                        raise request.exception()
+
+                    await get
+
+                batch = get.result()
+                if batch is None:
+                    break
+
+                yield batch
+
+        finally:
+            if not request.done():
+                request.cancel()
+
+    async def requestDeviceName(self) -> str:
+
+        if self._cached("deviceName", "manufacturer", "model"):
+            return self.deviceName
+
+        LOGGER.info(f"{self.address}: request device name")
+
+        name = await self.read_gatt_char_as_str(
+            uuid=GoveeThermometerHygrometer.UUID_NAME)
+        LOGGER.info(f"{self.address}: received device name: {name}")
+
+        self.deviceName = name or self.deviceName
+        if "H5075" in self.deviceName:
+            self.manufacturer = name[0:2]
+            self.model = name[2:7]
+        elif "H5074" in self.deviceName or "H5179" in self.deviceName:
+            self.manufacturer = name[0:5]
+            self.model = name[6:11]
+        else:
+            self.manufacturer = "Unknown"
+            self.model = "Unknown"
+
+        if self.cache and name:
+            for attribute in ("deviceName", "manufacturer", "model"):
+                self.cache.put(self.address, attribute,
+                               getattr(self, attribute))
+
+        return self.deviceName
+
+    async def requestHumidityAlarm(self, timeout: float = None):
+
+        if self._cached("humidityAlarm"):
+            return self.humidityAlarm
+
+        LOGGER.info(
+            f"{self.address}: request configuration for humidity alarm")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_ALARM_HUMIDTY, timeout=timeout)
+        return self.humidityAlarm
+
+    async def requestTemperatureAlarm(self, timeout: float = None):
+
+        if self._cached("temperatureAlarm"):
+            return self.temperatureAlarm
+
+        LOGGER.info(
+            f"{self.address}: request configuration for temperature alarm")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_ALARM_TEMPERATURE, timeout=timeout)
+        return self.temperatureAlarm
+
+    async def requestHumidityOffset(self, timeout: float = None):
+
+        if self._cached("humidityOffset"):
+            return self.humidityOffset
+
+        LOGGER.info(
+            f"{self.address}: request configuration for humidity offset")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_OFFSET_HUMIDTY, timeout=timeout)
+        return self.humidityOffset
+
+    async def requestTemperatureOffset(self, timeout: float = None):
+
+        if self._cached("temperatureOffset"):
+            return self.temperatureOffset
+
+        LOGGER.info(
+            f"{self.address}: request configuration for temperature offset")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_OFFSET_TEMPERATURE, timeout=timeout)
+        return self.temperatureOffset
+
+    async def requestBatteryLevel(self, timeout: float = None):
+
+        LOGGER.info(
+            f"{self.address}: request battery level")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_BATTERY_LEVEL, timeout=timeout)
+        return self.batteryLevel
+
+    async def requestMacAddress(self, timeout: float = None):
+
+        LOGGER.info(
+            f"{self.address}: request MAC address")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_MAC_ADDRESS, timeout=timeout)
+        return self.mac
+
+    async def requestMacAndSerial(self, timeout: float = None):
+
+        LOGGER.info(
+            f"{self.address}: request MAC address and serial no.")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_MAC_AND_SERIAL, timeout=timeout)
+        return self.macAndSerial
+
+    async def requestHardwareVersion(self, timeout: float = None):
+
+        if self._cached("hardware"):
+            return self.hardware
+
+        LOGGER.info(
+            f"{self.address}: request hardware version")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_HARDWARE, timeout=timeout)
+        return self.hardware
+
+    async def requestFirmwareVersion(self, timeout: float = None):
+
+        if self._cached("firmware"):
+            return self.firmware
+
+        LOGGER.info(
+            f"{self.address}: request firmware version")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_FIRMWARE, timeout=timeout)
+        return self.firmware
+
+    async def requestMeasurement(self, timeout: float = None):
+
+        LOGGER.info(
+            f"{self.address}: request current measurement")
+
+        await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_CURRENT_MEASUREMENT2, timeout=timeout)
+        return self.measurement
+
+    async def requestMeasurementAndBattery(self, device_type: str = "H5075", timeout: float = None):
+
+        LOGGER.info(
+            f"{self.address}: request current measurement and battery")
+        if device_type == "H5179":
+            # This doesn't work, it just returns 01
+            await self.write_H5179_hist_gatt_char_command(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.REQUEST_CURRENT_MEASUREMENT2)
+        else:
+            await self.request(uuid=GoveeThermometerHygrometer.UUID_COMMAND, command=GoveeThermometerHygrometer.REQUEST_CURRENT_MEASUREMENT, timeout=timeout)
+
+        return self.measurement
+
+    async def setHumidityAlarm(self, alarm: Alarm) -> bool:
+
+        LOGGER.info(
+            f"{self.address}: set humidity alarm: {str(alarm)}")
+
+        if alarm.active == None or alarm.lower < 0.0 or alarm.lower > 99.9 or alarm.upper < 0.1 or alarm.upper > 100:
+            LOGGER.error("Values for humidity alarm are invalid.")
+            return False
+
+        bytes = alarm.to_bytes()
+        return await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.SEND_ALARM_HUMIDTY, params=bytes)
+
+    async def setTemperatureAlarm(self, alarm: Alarm) -> bool:
+
+        LOGGER.info(
+            f"{self.address}: set temperature alarm: {str(alarm)}")
+
+        if alarm.active == None or alarm.lower < -20.0 or alarm.lower > 59.9 or alarm.upper < -19.9 or alarm.upper > 60.0:
+            LOGGER.error("Values for temperature alarm are invalid.")
+            return False
+
+        bytes = alarm.to_bytes()
+        return await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.SEND_ALARM_TEMPERATURE, params=bytes)
+
+    async def setHumidityOffset(self, offset: float) -> bool:
+
+        LOGGER.info(
+            f"{self.address}: set humidity offset: {offset:.1f} %")
+
+        if offset == None or offset < -20.0 or offset > 20.0:
+            LOGGER.error(
+                "Value for humidity offset is invalid. Must be between -20.0 and 20.0")
+            return False
+
+        bytes = struct.pack("<h", int(offset * 100))
+        return await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.SEND_OFFSET_HUMIDTY, params=bytes)
+
+    async def setTemperatureOffset(self, offset: float) -> bool:
+
+        LOGGER.info(
+            f"{self.address}: set temperature offset: {offset:.1f} °C")
+
+        if offset == None or offset < -3.0 or offset > 3.0:
+            LOGGER.error(
+                "Value for temperature offset is invalid. Must be between -3.0 and 3.0")
+            return False
+
+        bytes = struct.pack("<h", int(offset * 100))
+        return await self.request(uuid=GoveeThermometerHygrometer.UUID_DEVICE, command=GoveeThermometerHygrometer.SEND_OFFSET_TEMPERATURE, params=bytes)
+
+    @staticmethod
+    def advertisement_callback(consumer, unique: bool = True, progress=None, decoder: AdvertisementDecoder = None, readings: LatestReadings = None):
+
+        decoder = decoder or storage.alias.watch(
+            AdvertisementDecoder(offsets=storage.alias.offsets))
+        readings = readings if readings is not None else LatestReadings()
+        readings.on_evict.append(decoder.forget)
+        sightings = GoveeThermometerHygrometer.sightings
+        readings.on_evict.append(sightings.forget)
+        metrics = METRICS if METRICS.enabled else None
+
+        def callback(device: BLEDevice, advertising_data: AdvertisementData):
+
+            address = device.address
+            if unique and address in readings:
+                return
+
+            decoded = decoder.decode(
+                address, device.name, advertising_data.manufacturer_data)
+            if decoded:
+                battery, measurement = decoded
+                readings.update(address, device.name, battery, measurement)
+                sightings.see(device, advertising_data.rssi)
+                consumer(address, device.name, battery, measurement)
+                if metrics:
+                    metrics.count("scan.accepted")
+
+            else:
+                if metrics:
+                    metrics.count("scan.rejected")
+
+                if progress and device.name:
+                    progress(len(readings))
+
+        return callback
+
+    @staticmethod
+    async def scan(consumer, duration: int = 20, unique: bool = True, mac_filter: str = None, progress=None, readings: LatestReadings = None):
+
+        callback = GoveeThermometerHygrometer.advertisement_callback(
+            consumer, unique=unique, progress=progress, readings=readings)
+
+        async with BleakScanner(callback) as scanner:
+            if duration:
+                await asyncio.sleep(duration)
+            else:
+                while True:
+                    await asyncio.sleep(1)
+
+    @staticmethod
+    async def iterScan(duration: int = 20, unique: bool = True, progress=None, readings: LatestReadings = None, queue: ScanQueue = None) -> 'AsyncIterator[tuple[str, str, int, Measurement]]':
+
+        # advertisements are decoded in the callback of the scanner and put into queue while the consumer
+        # is busy. If the consumer falls behind, readings are dropped according to the policy of the queue
+        queue = queue if queue is not None else ScanQueue()
+        callback = GoveeThermometerHygrometer.advertisement_callback(
+            queue.put, unique=unique, progress=progress, readings=readings)
+
+        async with BleakScanner(callback):
+            deadline = time.monotonic() + duration if duration else None
+            while True:
+                try:
+                    reading = await asyncio.wait_for(queue.get(), timeout=deadline - time.monotonic() if deadline else None)
+                except asyncio.TimeoutError:
+                    break
+
+                if METRICS.enabled:
+                    METRICS.observe("scan.consumer_latency", (
+                        datetime.now() - reading[3].timestamp).total_seconds())
+
+                yield reading
+
+    def __str__(self) -> str:
+
+        s: 'list[str]' = list()
+
+        if self.deviceName:
+            s.append(f"Devicename:           {self.deviceName}")
+
+        s.append(f"Address:              {self.address}")
+
+        if self.manufacturer:
+            s.append(f"Manufacturer:         {self.manufacturer}")
+
+        if self.model:
+            s.append(f"Model:                {self.model}")
+
+        if self.hardware:
+            s.append(f"Hardware-Rev.:        {self.hardware}")
+
+        if self.firmware:
+            s.append(f"Firmware-Rev.:        {self.firmware}")
+
+        if self.batteryLevel:
+            s.append(f"Battery level:        {self.batteryLevel} %")
+
+        if self.humidityAlarm:
+            s.append(f"Humidity alarm:       {str(self.humidityAlarm)}")
+
+        if self.temperatureAlarm:
+            s.append(f"Temperature alarm:    {str(self.temperatureAlarm)}")
+
+        if self.humidityOffset:
+            s.append(f"Humidity offset:      {self.humidityOffset:.1f} %")
+
+        if self.temperatureOffset:
+            s.append(f"Temperature offset:   {self.temperatureOffset:.1f} °C")
+
+        if self.measurement:
+            s.append(f"\n{str(self.measurement)}")
+
+        return "\n".join(s)
+
+    def to_dict(self) -> dict:
+
+        return {
+            "name": self.deviceName.strip() if self.deviceName else None,
+            "address": self.address,
+            "manufacturer": self.manufacturer,
+            "model": self.model,
+            "hardware": self.hardware,
+            "firmware": self.firmware,
+            "battery": self.batteryLevel,
+            "humidityAlarm": self.humidityAlarm.to_dict() if self.humidityAlarm else None,
+            "temperatureAlarm": self.temperatureAlarm.to_dict() if self.temperatureAlarm else None,
+            "humidityOffset": self.humidityOffset,
+            "temperatureOffset": self.temperatureOffset,
+            "currentMeasurement": self.measurement.to_dict() if self.measurement else None
+        }
+
+
+class DevicePool():
+
+    def __init__(self, idle_timeout: float = 300.0, cache: MetadataCache = None, timeout: float = None) -> None:
+
+        self.idle_timeout: float = idle_timeout
+        self.cache: MetadataCache = cache
+        self.timeout: float = timeout
+        self.devices: 'dict[str, GoveeThermometerHygrometer]' = dict()
+        self.last_used: 'dict[str, float]' = dict()
+        self.locks: 'dict[str, asyncio.Lock]' = dict()
+        self.reconnects: 'set[asyncio.Task]' = set()
+
+    def lock(self, mac: str) -> asyncio.Lock:
+
+        # serializes requests to the same device
+        if mac not in self.locks:
+            self.locks[mac] = asyncio.Lock()
+
+        return self.locks[mac]
+
+    def _disconnected(self, client: BleakClient) -> None:
+
+        # devices which have been dropped by the device or the adapter are reconnected right away unless idle
+        if self.devices.get(client.address) is client:
+            LOGGER.info(f"{client.address}: connection has been dropped")
+            if time.monotonic() - self.last_used.get(client.address, 0.0) > self.idle_timeout:
+                return
+
+            task = asyncio.ensure_future(self._reconnect(client.address))
+            self.reconnects.add(task)
+            task.add_done_callback(self.reconnects.discard)
+
+    async def _reconnect(self, mac: str) -> None:
+
+        async with self.lock(mac):
+            device = self.devices.get(mac)
+            if not device or device.is_connected:
+                return
+
+            try:
+                await self.get(mac, touch=False)
+                LOGGER.info(f"{mac}: reconnected")
+
+            except Exception as e:
+                # next request tries again
+                LOGGER.warning(f"{mac}: reconnect has failed ({str(e) or type(e).__name__})")
+
+    async def get(self, mac: str, touch: bool = True) -> GoveeThermometerHygrometer:
+
+        # caller must hold the lock of the device
+        if touch:
+            self.last_used[mac] = time.monotonic()
+
+        device = self.devices.get(mac)
+        if device and device.is_connected:
+            return device
+
+        if device:
+            LOGGER.info(f"{mac}: reconnect")
+
+        try:
+            device = await GoveeThermometerHygrometer.open(
+                mac, disconnected_callback=self._disconnected, cache=self.cache, timeout=self.timeout)
+
+        finally:
+            self.devices.pop(mac, None)
+
+        if not device.is_connected:
+            raise ConnectionError(f"Connecting to {mac} has failed")
+
+        self.devices[mac] = device
+        return device
+
+    async def evict(self) -> None:
+
+        for mac in list(self.devices):
+            if time.monotonic() - self.last_used[mac] > self.idle_timeout and not self.lock(mac).locked():
+                LOGGER.info(f"{mac}: idle for more than "
+                            f"{self.idle_timeout:.0f} seconds")
+                device = self.devices.pop(mac)
+                await device.disconnect()
+
+    async def close(self) -> None:
+
+        for task in list(self.reconnects):
+            task.cancel()
+
+        devices = list(self.devices.values())
+        self.devices.clear()
+        for device in devices:
+            await device.disconnect()
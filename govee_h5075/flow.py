@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from .core import Measurement, MeasurementBatch
+
+
+class DataControl():
+
+    DATA_CONTROL_IDLE = 0
+    DATA_CONTROL_WAIT = 1
+    DATA_CONTROL_STARTED = 2
+    DATA_CONTROL_COMPLETE = 3
+    DATA_CONTROL_INCOMPLETE = -1
+
+    def __init__(self, expected_msg: int, humidityOffset: float = 0, temperatureOffset: float = 0, progress=None, queue: asyncio.Queue = None, max_pending: int = None) -> None:
+
+        self.timestamp: datetime = datetime.now()
+        self.status: int = DataControl.DATA_CONTROL_IDLE
+        self.expected_msg: int = expected_msg
+        self.counted_msg: int = 0
+        self.received_msg: int = 0
+        self.measurements: MeasurementBatch = MeasurementBatch(
+            humidityOffset=humidityOffset, temperatureOffset=temperatureOffset)
+        self.device_category: str = ""
+
+        self.completed: asyncio.Event = asyncio.Event()
+        self.started: float = time.monotonic()
+        self.last_activity: float = self.started
+        self.progress = progress
+
+        # if given, records are put into queue message by message instead of being kept. At most max_pending
+        # batches wait for the queue, if there are more the oldest ones are dropped and counted in overflow
+        self.queue: asyncio.Queue = queue
+        self.pending: deque = deque()
+        self.max_pending: int = max_pending
+        self.overflow: int = 0
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.records: int = 0
+
+        self.set_device_category("")
+
+    def set_device_category(self, device_type):
+        self.device_category = self.get_device_category(device_type)
+        return
+
+    @staticmethod
+    def get_device_category(device_type):
+
+        if device_type == "H5179":
+            device_category = "H5179"
+        elif device_type in ["H5075", "H5074"]:
+            device_category = "H507*"
+        else:
+            device_category = "H507*"
+
+        return device_category
+
+    def count(self) -> None:
+
+        self.counted_msg += 1
+        self.touch()
+
+        if self.queue:
+            if self.max_pending and len(self.pending) >= self.max_pending:
+                self.overflow += len(self.pending.popleft())
+
+            self.pending.append(self.take())
+
+        if self.progress:
+            self.progress(self.counted_msg, self.expected_msg,
+                          self.records_per_second(), self.eta())
+
+    def take(self) -> MeasurementBatch:
+
+        batch = self.measurements
+        self.records += len(batch)
+        self.measurements = MeasurementBatch(
+            humidityOffset=batch.humidityOffset, temperatureOffset=batch.temperatureOffset)
+        batch.complete = False
+        return batch
+
+    async def forward(self) -> None:
+
+        # notifications can't be paused, so batches wait in pending while the queue is full, i.e. backpressure
+        # ends here. The lock keeps the order of batches since only one handler at a time puts into the queue
+        async with self.lock:
+            while self.pending:
+                await self.queue.put(self.pending.popleft())
+
+    def touch(self) -> None:
+
+        self.last_activity = time.monotonic()
+
+    def complete(self, status: int) -> None:
+
+        self.status = status
+        self.completed.set()
+
+    def idle(self) -> float:
+
+        return time.monotonic() - self.last_activity
+
+    def records_per_second(self) -> float:
+
+        duration = self.last_activity - self.started
+        return (self.records + len(self.measurements)) / duration if duration > 0 else 0.0
+
+    def eta(self) -> float:
+
+        if not self.counted_msg:
+            return None
+
+        duration = self.last_activity - self.started
+        return max(0, self.expected_msg - self.counted_msg) * duration / self.counted_msg
+
+
+class ScanQueue():
+
+    DROP_OLDEST = "drop-oldest"
+    COALESCE = "coalesce"
+    POLICIES = [DROP_OLDEST, COALESCE]
+
+    def __init__(self, maxsize: int = 256, policy: str = DROP_OLDEST) -> None:
+
+        if policy not in ScanQueue.POLICIES:
+            raise ValueError(f"unknown drop policy {policy}")
+
+        self.maxsize: int = maxsize
+        self.policy: str = policy
+
+        # readings are keyed by address if coalesced, otherwise by sequence number
+        self._items: OrderedDict = OrderedDict()
+        self._seq: int = 0
+
+        # created by the first get since the queue may be created outside of the running loop
+        self._ready: asyncio.Event = None
+
+        # called with each reading before it is queued, e.g. to store readings which may be dropped later
+        self.on_put: 'list[callable]' = list()
+
+        self.queued: int = 0
+        self.dropped: int = 0
+        self.coalesced: int = 0
+
+    def put(self, address: str, name: str, battery: int, measurement: Measurement) -> None:
+
+        for on_put in self.on_put:
+            on_put(address, name, battery, measurement)
+
+        reading = (address, name, battery, measurement)
+        self.queued += 1
+        if self.policy == ScanQueue.COALESCE and address in self._items:
+            # newer reading replaces the waiting one but keeps its position
+            self._items[address] = reading
+            self.coalesced += 1
+            return
+
+        if len(self._items) >= self.maxsize:
+            self._items.popitem(last=False)
+            self.dropped += 1
+
+        if self.policy == ScanQueue.COALESCE:
+            self._items[address] = reading
+        else:
+            self._items[self._seq] = reading
+            self._seq += 1
+
+        if self._ready:
+            self._ready.set()
+
+    async def get(self) -> 'tuple[str, str, int, Measurement]':
+
+        if self._ready is None:
+            self._ready = asyncio.Event()
+
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+
+        return self._items.popitem(last=False)[1]
+
+    def __len__(self) -> int:
+
+        return len(self._items)
@@ -0,0 +1,121 @@
+import bisect
+import time
+from contextlib import contextmanager
+
+
+class Histogram():
+
+    # upper bounds of buckets from 10 µs up to about 10^7, i.e. for durations in seconds as well as for rates
+    BOUNDS = [1e-5 * 2 ** i for i in range(40)]
+
+    def __init__(self) -> None:
+
+        self.buckets: 'list[int]' = [0] * (len(Histogram.BOUNDS) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.min: float = None
+        self.max: float = None
+
+    def observe(self, value: float) -> None:
+
+        self.buckets[bisect.bisect_left(Histogram.BOUNDS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def percentile(self, p: float) -> float:
+
+        # interpolated within the bucket which contains the percentile
+        if not self.count:
+            return None
+
+        rank = p * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                lower = Histogram.BOUNDS[i - 1] if i else 0.0
+                upper = Histogram.BOUNDS[i] if i < len(Histogram.BOUNDS) else self.max
+                value = lower + (upper - lower) * (rank - seen) / n
+                return min(max(value, self.min), self.max)
+
+            seen += n
+
+        return self.max
+
+    def to_dict(self) -> dict:
+
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99)
+        }
+
+
+class Metrics():
+
+    def __init__(self, clock=time.perf_counter) -> None:
+
+        # nothing is recorded unless enabled, hot paths check enabled before recording
+        self.enabled: bool = False
+        self.clock = clock
+        self.started: float = clock()
+        self.counters: 'dict[str, int]' = dict()
+        self.histograms: 'dict[str, Histogram]' = dict()
+
+    def enable(self, enabled: bool = True) -> 'Metrics':
+
+        self.enabled = enabled
+        return self
+
+    def reset(self) -> None:
+
+        self.started = self.clock()
+        self.counters.clear()
+        self.histograms.clear()
+
+    def count(self, name: str, n: int = 1) -> None:
+
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+
+        if not self.enabled:
+            return
+
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+
+        histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str):
+
+        # observes duration of block in seconds, also if block raises
+        started = self.clock()
+        try:
+            yield
+
+        finally:
+            self.observe(name, self.clock() - started)
+
+    def snapshot(self) -> dict:
+
+        # counters with rate per second since start or reset, histograms of durations in seconds or rates
+        elapsed = self.clock() - self.started
+        return {
+            "elapsed": elapsed,
+            "counters": {name: {"count": n, "rate": n / elapsed if elapsed > 0 else None}
+                         for name, n in sorted(self.counters.items())},
+            "histograms": {name: histogram.to_dict() for name, histogram in sorted(self.histograms.items())}
+        }
+
+
+METRICS = Metrics()
@@ -0,0 +1,287 @@
+import asyncio
+import inspect
+import math
+import random
+import struct
+import time
+from datetime import datetime
+
+from bleak import BleakClient
+
+from .core import LOGGER, Alarm, Codec, Measurement
+from .device import GoveeThermometerHygrometer
+
+
+class SimulatedDevice():
+
+    MODELS = ["H5075", "H5074", "H5179"]
+
+    H507X_RECORD = struct.Struct(">H")
+    H5179_RECORD = struct.Struct("<hH")
+
+    def __init__(self, address: str, model: str = "H5075", temperatureC: float = 21.5, relHumidity: float = 45.0, battery: int = 85,
+                 rate: float = None, jitter: float = 0.0, loss: float = 0.0, latency: float = 0.0, seed: int = None) -> None:
+
+        if model not in SimulatedDevice.MODELS:
+            raise ValueError(f"unknown model {model}")
+
+        self.address: str = address.upper()
+        self.model: str = model
+        self.name: str = (f"GV{model}_" if model == "H5075" else f"Govee_{model}_") + \
+            self.address.replace(":", "")[-4:]
+
+        self.temperatureC: float = temperatureC
+        self.relHumidity: float = relHumidity
+        self.battery: int = battery
+        self.humidityAlarm: Alarm = Alarm(active=False, lower=30.0, upper=70.0)
+        self.temperatureAlarm: Alarm = Alarm(active=False, lower=15.0, upper=26.0)
+        self.humidityOffset: float = 0.0
+        self.temperatureOffset: float = 0.0
+        self.hardware: str = "1.00.02"
+        self.firmware: str = "1.04.06"
+        self.serial: int = 0x1234
+
+        # notifications of recorded data per second, None for as fast as possible, random delay in seconds
+        # added to each notification, probability that a notification gets lost and delay of responses
+        self.rate: float = rate
+        self.jitter: float = jitter
+        self.loss: float = loss
+        self.latency: float = latency
+        self.random: random.Random = random.Random(seed)
+
+        self.sent: int = 0
+        self.lost: int = 0
+
+    def record(self, minute: int) -> 'tuple[float, float]':
+
+        # recorded data follows a daily cycle around the current measurement
+        phase = 2 * math.pi * (minute % 1440) / 1440
+        return round(self.temperatureC + 2 * math.sin(phase), 1), round(self.relHumidity - 5 * math.sin(phase), 1)
+
+    def respond(self, uuid: str, data: bytes) -> 'list[tuple[str, bytes]]':
+
+        opcode = Codec.opcode(data)
+        params = data[2:]
+        if opcode == 0xaa01:
+            value = struct.pack(">hhB", round(self.temperatureC * 100),
+                                round(self.relHumidity * 100), self.battery)
+        elif opcode == 0xaa03:
+            value = self.humidityAlarm.to_bytes()
+        elif opcode == 0xaa04:
+            value = self.temperatureAlarm.to_bytes()
+        elif opcode == 0xaa06:
+            value = Codec.OFFSET.pack(round(self.humidityOffset * 100))
+        elif opcode == 0xaa07:
+            value = Codec.OFFSET.pack(round(self.temperatureOffset * 100))
+        elif opcode == 0xaa08:
+            value = bytes([self.battery])
+        elif opcode == 0xaa0a:
+            value = struct.pack("<hh", round(self.temperatureC * 100),
+                                round(self.relHumidity * 100))
+        elif opcode == 0xaa0c:
+            value = self._mac_bytes() + struct.pack("<h", self.serial)
+        elif opcode == 0xaa0d:
+            value = self.hardware.encode()
+        elif opcode == 0xaa0e:
+            value = self.firmware.encode()
+        elif opcode == 0xaa0f:
+            value = self._mac_bytes()
+        elif opcode == 0x3303:
+            self.humidityAlarm = Alarm.from_bytes(params[0:5])
+            value = None
+        elif opcode == 0x3304:
+            self.temperatureAlarm = Alarm.from_bytes(params[0:5])
+            value = None
+        elif opcode == 0x3306:
+            self.humidityOffset = Codec.OFFSET.unpack_from(params)[0] / 100.0
+            value = None
+        elif opcode == 0x3307:
+            self.temperatureOffset = Codec.OFFSET.unpack_from(params)[0] / 100.0
+            value = None
+        else:
+            LOGGER.debug(f"{self.address}: simulator ignores request {data.hex(' ')}")
+            return list()
+
+        return [(uuid, Codec._encode(data[0:2], value, Codec.FRAME_LENGTH))]
+
+    def history(self, data: bytes) -> 'list[tuple[str, bytes]]':
+
+        # transfer starts with 33 01, followed by records and ends with ee 01 and the number of sent messages
+        frames = [(GoveeThermometerHygrometer.UUID_COMMAND, Codec._encode(
+            GoveeThermometerHygrometer.SEND_RECORDS_TX_REQUEST, None, Codec.FRAME_LENGTH))]
+        now = Measurement.minutes_since_1970(datetime.now())
+
+        if self.model == "H5179":
+            # minutes since 1970 of the newest record of each message, records go back in time
+            start, end = struct.unpack_from("<II", data, 2)
+            for first in range(end, start - 1, -4):
+                frame = bytearray(Measurement.UINT32_LE.pack(first))
+                for minute in range(first, first - 4, -1):
+                    frame += SimulatedDevice.H5179_RECORD.pack(*[round(v * 100) for v in self.record(minute)]) \
+                        if minute >= start else b"\xff" * 4
+                frames.append((GoveeThermometerHygrometer.UUID_DATA, bytes(frame)))
+
+        else:
+            # minutes in the past of the oldest record of each message, records go forth in time
+            start, end = struct.unpack_from(">HH", data, 2)
+            for first in range(start, end - 1, -6):
+                frame = bytearray(SimulatedDevice.H507X_RECORD.pack(first))
+                for minutes_back in range(first, first - 6, -1):
+                    frame += SimulatedDevice.encode_H507x(*self.record(now - minutes_back)) \
+                        if minutes_back >= end else b"\xff" * 3
+                frames.append((GoveeThermometerHygrometer.UUID_DATA, bytes(frame)))
+
+        frames.append((GoveeThermometerHygrometer.UUID_COMMAND, Codec._encode(
+            GoveeThermometerHygrometer.RECORDS_TX_COMPLETED, Codec.COUNT.pack(len(frames) - 1), Codec.FRAME_LENGTH)))
+        return frames
+
+    @staticmethod
+    def encode_H507x(temperatureC: float, relHumidity: float) -> bytes:
+
+        raw = round(abs(temperatureC) * 10) * 1000 + round(relHumidity * 10)
+        if temperatureC < 0:
+            raw |= 0x800000
+
+        return raw.to_bytes(3, "big")
+
+    def _mac_bytes(self) -> bytes:
+
+        return bytes(reversed(bytes.fromhex(self.address.replace(":", ""))))
+
+    def delay(self) -> float:
+
+        return self.random.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def lose(self) -> bool:
+
+        if self.loss and self.random.random() < self.loss:
+            self.lost += 1
+            return True
+
+        self.sent += 1
+        return False
+
+
+class SimulatedClient(BleakClient):
+
+    # simulated devices by address, unknown addresses are simulated as H5075 with default values
+    devices: 'dict[str, SimulatedDevice]' = dict()
+
+    def __init__(self, address_or_ble_device, disconnected_callback=None, **kwargs) -> None:
+
+        if isinstance(address_or_ble_device, SimulatedDevice):
+            self.device: SimulatedDevice = address_or_ble_device
+        else:
+            address = getattr(address_or_ble_device, "address", address_or_ble_device).upper()
+            self.device = SimulatedClient.devices.get(address) or SimulatedDevice(address)
+
+        SimulatedClient.devices[self.device.address] = self.device
+        self._disconnected_callback = disconnected_callback
+        self._connected: bool = False
+        self._callbacks: 'dict[str, callable]' = dict()
+        self._transfer: asyncio.Task = None
+        self._tasks: 'set[asyncio.Task]' = set()
+
+    @staticmethod
+    def add(*devices: SimulatedDevice) -> None:
+
+        for device in devices:
+            SimulatedClient.devices[device.address] = device
+
+    @property
+    def address(self) -> str:
+
+        return self.device.address
+
+    @property
+    def is_connected(self) -> bool:
+
+        return self._connected
+
+    async def connect(self, **kwargs) -> bool:
+
+        if self.device.latency:
+            await asyncio.sleep(self.device.latency)
+
+        self._connected = True
+        return True
+
+    async def disconnect(self) -> bool:
+
+        if self._transfer:
+            self._transfer.cancel()
+
+        self._callbacks.clear()
+        if self._connected:
+            self._connected = False
+            if self._disconnected_callback:
+                self._disconnected_callback(self)
+
+        return True
+
+    async def start_notify(self, char_specifier, callback, **kwargs) -> None:
+
+        self._callbacks[str(char_specifier)] = callback
+
+    async def stop_notify(self, char_specifier) -> None:
+
+        self._callbacks.pop(str(char_specifier), None)
+
+    async def read_gatt_char(self, char_specifier, **kwargs) -> bytearray:
+
+        if self.device.latency:
+            await asyncio.sleep(self.device.latency)
+
+        if str(char_specifier) == GoveeThermometerHygrometer.UUID_NAME:
+            return bytearray(self.device.name.encode())
+
+        return bytearray()
+
+    async def write_gatt_char(self, char_specifier, data, response: bool = None) -> None:
+
+        data = bytes(data)
+        if (self.device.model == "H5179" and len(data) == 10 and data[0:2] == GoveeThermometerHygrometer.SEND_RECORDS_H5179_TX_REQUEST) \
+                or data[0:2] == GoveeThermometerHygrometer.SEND_RECORDS_TX_REQUEST:
+            if self._transfer:
+                self._transfer.cancel()
+
+            self._transfer = asyncio.ensure_future(
+                self._send(self.device.history(data), rate=self.device.rate))
+
+        else:
+            asyncio.ensure_future(self._send(
+                self.device.respond(str(char_specifier), data)))
+
+    async def _send(self, notifications: 'list[tuple[str, bytes]]', rate: float = None) -> None:
+
+        interval = 1 / rate if rate else 0.0
+        due = time.monotonic() + self.device.latency
+        for i, (uuid, frame) in enumerate(notifications):
+            due += self.device.delay()
+            wait = due - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            elif i % 64 == 0:
+                # give the receiver a chance to run if the simulator is behind or unlimited
+                await asyncio.sleep(0)
+
+            due += interval
+            if not self._connected:
+                return
+
+            callback = self._callbacks.get(uuid)
+            if callback is None or self.device.lose():
+                continue
+
+            # like bleak, coroutines run as tasks, i.e. a slow receiver doesn't slow down the device
+            if inspect.iscoroutinefunction(callback):
+                task = asyncio.ensure_future(callback(uuid, bytearray(frame)))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                callback(uuid, bytearray(frame))
+
+
+class SimulatedGoveeThermometerHygrometer(GoveeThermometerHygrometer, SimulatedClient):
+
+    pass
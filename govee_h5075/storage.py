@@ -0,0 +1,647 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from .core import LOGGER, AdvertisementDecoder, Alarm, Measurement, MeasurementBatch
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+if TYPE_CHECKING:
+    from bleak import BLEDevice
+
+
+def peak_memory() -> int:
+
+    # high-water mark of resident memory in bytes, not available on Windows
+    if not resource:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def home_directory() -> str:
+
+    return os.environ['USERPROFILE'] if os.name == "nt" else os.environ['HOME'] if "HOME" in os.environ else "~"
+
+
+class Alias():
+
+    _KNOWN_DEVICES_FILE = ".known_govees"
+
+    def __init__(self, filename: str = None) -> None:
+
+        self.filename: str = filename or os.path.join(
+            home_directory(), Alias._KNOWN_DEVICES_FILE)
+
+        # alias and offsets by upper case MAC address, offsets as single record for decoders
+        self.aliases: 'dict[str,tuple[str, float, float]]' = dict()
+        self.offsets: 'dict[str, tuple[float, float]]' = dict()
+
+        # (alias, MAC address) sorted by alias for prefix search
+        self._index: 'list[tuple[str, str]]' = list()
+        self.mtime: int = None
+        self.decoders: 'weakref.WeakSet[AdvertisementDecoder]' = weakref.WeakSet()
+        self.load()
+
+    def _stat(self) -> int:
+
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self) -> None:
+
+        aliases: 'dict[str,tuple[str, float, float]]' = dict()
+        self.mtime = self._stat()
+        try:
+            if self.mtime is not None:
+                with open(self.filename, "r") as ins:
+                    for line in ins:
+                        _m = re.match(
+                            r"([0-9A-Fa-f:]+) +([^ ]+)( (-?\d+\.\d) (-?\d+\.\d))?$", line)
+                        if _m and _m.groups()[0].upper()[0:9] in AdvertisementDecoder.MAC_PREFIX:
+
+                            alias = _m.groups()[1].strip()
+                            humidityOffset = float(_m.groups()[3]) if _m.groups()[
+                                3] else 0.0
+                            temperatureOffset = float(
+                                _m.groups()[4]) if _m.groups()[4] else 0.0
+
+                            aliases[_m.groups()[0].upper()] = (
+                                alias, humidityOffset, temperatureOffset)
+
+        except:
+            pass
+
+        # dicts are updated in place since decoders and writers keep references
+        self.aliases.clear()
+        self.aliases.update(aliases)
+        self.offsets.clear()
+        self.offsets.update({mac: (humidityOffset, temperatureOffset)
+                            for mac, (_, humidityOffset, temperatureOffset) in aliases.items()})
+        self._index = sorted((alias, mac)
+                             for mac, (alias, _, _) in aliases.items())
+
+        for decoder in self.decoders:
+            decoder.reset()
+
+    def refresh(self) -> bool:
+
+        # reloads known devices if file has been changed, created or removed since last load
+        if self._stat() == self.mtime:
+            return False
+
+        self.load()
+        LOGGER.info(
+            f"Reloaded {len(self.aliases)} known devices from {self.filename}")
+        return True
+
+    def watch(self, decoder: AdvertisementDecoder) -> AdvertisementDecoder:
+
+        # decoders forget cached offsets after reload
+        self.decoders.add(decoder)
+        return decoder
+
+    def matches(self, label: str) -> 'list[tuple[str, str]]':
+
+        i = bisect.bisect_left(self._index, (label,))
+        matches = list()
+        while i < len(self._index) and self._index[i][0].startswith(label):
+            matches.append(self._index[i])
+            i += 1
+
+        return matches
+
+    def resolve(self, label: str) -> str:
+
+        if label.upper()[0:9] in AdvertisementDecoder.MAC_PREFIX:
+            return label.upper()
+
+        matches = self.matches(label)
+        exact = [m for m in matches if m[0] == label]
+        macs = sorted({mac for _, mac in (exact or matches)})
+        if len(macs) > 1:
+            LOGGER.error(f"Alias {label} is ambiguous: " +
+                         ", ".join(f"{alias} ({mac})" for alias, mac in (exact or matches)))
+            return None
+
+        return macs[0] if macs else None
+
+
+class MeasurementStore():
+
+    _STORE_DIR = ".govee_history"
+
+    # minutes since 1/1/1970 00:00, temperature and humidity in 0.01 resolution
+    RECORD = struct.Struct("<Ihh")
+
+    def __init__(self, directory: str = None) -> None:
+
+        self.directory: str = directory or os.path.join(
+            home_directory(), MeasurementStore._STORE_DIR)
+        self._last: 'dict[str, int]' = dict()
+
+    def _filename(self, mac: str) -> str:
+
+        return os.path.join(self.directory, mac.upper().replace(":", "") + ".dat")
+
+    def _records(self, filename: str) -> int:
+
+        # ignores trailing bytes of an interrupted append
+        return os.path.getsize(filename) // MeasurementStore.RECORD.size if os.path.isfile(filename) else 0
+
+    def last(self, mac: str, reload: bool = False) -> int:
+
+        # other processes may have added records meanwhile, so cached minute is a lower bound only
+        mac = mac.upper()
+        if reload or mac not in self._last:
+            filename = self._filename(mac)
+            n = self._records(filename)
+            if n:
+                with open(filename, "rb") as ins:
+                    ins.seek((n - 1) * MeasurementStore.RECORD.size)
+                    self._last[mac] = MeasurementStore.RECORD.unpack(
+                        ins.read(MeasurementStore.RECORD.size))[0]
+            else:
+                self._last[mac] = None
+
+        return self._last[mac]
+
+    @contextmanager
+    def _lock(self, mac: str):
+
+        # serializes writers of a device, e.g. measure mode and sync at the same time. The lock is taken on
+        # a file of its own since merges replace the data file. Not available on Windows
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._filename(mac) + ".lock", "a") as lock:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+
+            yield
+
+    def _write(self, mac: str, records: 'list[tuple[int, float, float]]') -> int:
+
+        # records must be sorted and newer than last record since they are appended, lock of device is held
+        if not records:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        filename = self._filename(mac)
+        n = self._records(filename)
+        if os.path.isfile(filename) and os.path.getsize(filename) != n * MeasurementStore.RECORD.size:
+            os.truncate(filename, n * MeasurementStore.RECORD.size)
+
+        pack = MeasurementStore.RECORD.pack
+        with open(filename, "ab") as out:
+            out.write(b"".join([pack(minute, round(temperatureC * 100), round(relHumidity * 100))
+                                for minute, temperatureC, relHumidity in records]))
+
+        self._last[mac.upper()] = records[-1][0]
+        return len(records)
+
+    def _merge(self, mac: str, records: 'list[tuple[int, float, float]]') -> int:
+
+        # records must be sorted and older than last record. Stored records from the first given minute on are
+        # merged with them and the file is replaced, records of minutes which are stored already are kept.
+        # Lock of device is held
+        filename = self._filename(mac)
+        n = self._records(filename)
+        size = MeasurementStore.RECORD.size
+        with open(filename, "rb") as ins, mmap.mmap(ins.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = MeasurementStore._bisect(mm, n, records[0][0])
+            head = mm[:first * size]
+            tail = list(MeasurementStore.RECORD.iter_unpack(mm[first * size:n * size]))
+
+        stored = {record[0] for record in tail}
+        added = [(minute, round(temperatureC * 100), round(relHumidity * 100))
+                 for minute, temperatureC, relHumidity in records if minute not in stored]
+        if not added:
+            return 0
+
+        pack = MeasurementStore.RECORD.pack
+        with open(filename + ".tmp", "wb") as out:
+            out.write(head)
+            out.write(b"".join([pack(*record) for record in sorted(tail + added)]))
+
+        os.replace(filename + ".tmp", filename)
+        return len(added)
+
+    def append(self, mac: str, measurement: Measurement) -> bool:
+
+        minute = Measurement.minutes_since_1970(measurement.timestamp)
+        last = self.last(mac)
+        if last is not None and minute <= last:
+            return False
+
+        with self._lock(mac):
+            last = self.last(mac, reload=True)
+            if last is not None and minute <= last:
+                return False
+
+            return self._write(mac, [(minute, measurement.temperatureC, measurement.relHumidity)]) == 1
+
+    def append_batch(self, mac: str, measurements: MeasurementBatch) -> int:
+
+        # records newer than the last stored record are appended, older ones, e.g. of a sync after
+        # measure mode or of an earlier time range, are merged into the store
+        records: 'dict[int, tuple[float, float]]' = dict()
+        for minute, temperatureC, relHumidity in zip(measurements.minutes, measurements.temperatureC, measurements.relHumidity):
+            records[minute] = (temperatureC, relHumidity)
+
+        records = [(minute, *records[minute]) for minute in sorted(records)]
+        with self._lock(mac):
+            last = self.last(mac, reload=True)
+            older = [record for record in records if last is not None and record[0] < last]
+            newer = [record for record in records if last is None or record[0] > last]
+            return (self._merge(mac, older) if older else 0) + self._write(mac, newer)
+
+    @staticmethod
+    def _bisect(mm: mmap.mmap, n: int, minute: int) -> int:
+
+        # index of first record with given minute or later
+        lo, hi = 0, n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from("<I", mm, mid * MeasurementStore.RECORD.size)[0] < minute:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def query(self, mac: str, start: int, end: int) -> MeasurementBatch:
+
+        # stored records from start to end in minutes since 1/1/1970 00:00, values are calibrated already
+        measurements = MeasurementBatch()
+        filename = self._filename(mac)
+        n = self._records(filename)
+        if not n:
+            return measurements
+
+        size = MeasurementStore.RECORD.size
+        with open(filename, "rb") as ins, mmap.mmap(ins.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = MeasurementStore._bisect(mm, n, start)
+            last = MeasurementStore._bisect(mm, n, end + 1)
+            for minute, temperatureC, relHumidity in MeasurementStore.RECORD.iter_unpack(mm[first * size:last * size]):
+                measurements.append(Measurement.from_minutes_since_1970(
+                    minute), temperatureC / 100.0, relHumidity / 100.0)
+
+        return measurements
+
+
+class HistorySync():
+
+    _WATERMARKS_FILE = "watermarks.json"
+
+    # minutes of recorded data kept by the devices, i.e. 20 days
+    HISTORY = 28800
+
+    def __init__(self, store: MeasurementStore = None) -> None:
+
+        self.store: MeasurementStore = store or MeasurementStore()
+        self.watermarks: 'dict[str, int]' = dict()
+
+        filename = os.path.join(
+            self.store.directory, HistorySync._WATERMARKS_FILE)
+        if os.path.isfile(filename):
+            try:
+                with open(filename, "r") as ins:
+                    self.watermarks = json.load(ins)
+
+            except ValueError:
+                LOGGER.warning(f"Unable to read watermarks from {filename}")
+
+    def watermark(self, mac: str) -> int:
+
+        # last synced minute since 1/1/1970 00:00
+        return self.watermarks.get(mac.upper())
+
+    def merge(self, mac: str, measurements: MeasurementBatch, start: int = None) -> int:
+
+        # records of minutes which are stored already are overlaps of former syncs or measurements
+        stored = self.store.append_batch(
+            mac, measurements) if len(measurements) else 0
+
+        if not measurements.complete:
+            # keep watermark so that missing records are requested again
+            LOGGER.warning(
+                f"{mac}: recorded data is incomplete, watermark not updated")
+            return stored
+
+        if not len(measurements):
+            return stored
+
+        # minutes between watermark and first requested minute (since 1/1/1970 00:00) haven't been requested yet,
+        # unless the device doesn't keep them anymore
+        watermark = self.watermark(mac)
+        oldest = Measurement.minutes_since_1970(datetime.now()) - HistorySync.HISTORY
+        if start is not None and watermark and start > max(watermark + 1, oldest):
+            LOGGER.info(
+                f"{mac}: records before the requested time range have not been synced, watermark not updated")
+            return stored
+
+        # watermark is moved only to the newest minute which is in the store now
+        newest = max(measurements.minutes)
+        if not self.store.query(mac, newest, newest):
+            LOGGER.warning(
+                f"{mac}: recorded data has not been stored, watermark not updated")
+            return stored
+
+        self.watermarks[mac.upper()] = max(
+            self.watermarks.get(mac.upper(), 0), newest)
+        filename = os.path.join(
+            self.store.directory, HistorySync._WATERMARKS_FILE)
+        with open(filename + ".tmp", "w") as out:
+            json.dump(self.watermarks, out, indent=2)
+
+        os.replace(filename + ".tmp", filename)
+        return stored
+
+    def load(self, mac: str, start: int, end: int) -> MeasurementBatch:
+
+        return self.store.query(mac, start, end)
+
+
+class MetadataCache():
+
+    _METADATA_FILE = ".govee_metadata.json"
+
+    # cached attributes of GoveeThermometerHygrometer by group
+    ATTRIBUTES = {
+        "deviceName": "info",
+        "manufacturer": "info",
+        "model": "info",
+        "hardware": "info",
+        "firmware": "info",
+        "humidityAlarm": "config",
+        "temperatureAlarm": "config",
+        "humidityOffset": "config",
+        "temperatureOffset": "config"
+    }
+
+    # seconds after which cached values are requested again, device information rarely changes
+    TTL = {"info": 7 * 86400.0, "config": 86400.0}
+
+    def __init__(self, filename: str = None, ttl: 'dict[str, float]' = None, clock=time.time) -> None:
+
+        self.filename: str = filename or os.path.join(
+            home_directory(), MetadataCache._METADATA_FILE)
+        self.ttl: 'dict[str, float]' = dict(MetadataCache.TTL, **(ttl or dict()))
+        self.clock = clock
+        self.dirty: bool = False
+        self.mtime: int = None
+
+        # time of request and value of each attribute by MAC address. Invalidated attributes are kept without
+        # value so that other processes, e.g. the daemon, don't bring them back when they merge the file
+        self.entries: 'dict[str, dict[str, list]]' = dict()
+        self.load()
+
+    def _stat(self) -> int:
+
+        try:
+            return os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+
+    def load(self) -> None:
+
+        # merges entries of file, the newer entry of each attribute wins
+        self.mtime = self._stat()
+        if self.mtime is None:
+            return
+
+        try:
+            with open(self.filename, "r") as ins:
+                entries = json.load(ins)
+
+        except ValueError:
+            LOGGER.warning(
+                f"Unable to read device metadata from {self.filename}")
+            return
+
+        for mac, attributes in entries.items():
+            cached = self.entries.setdefault(mac, dict())
+            for attribute, entry in attributes.items():
+                if attribute not in cached or entry[0] > cached[attribute][0]:
+                    cached[attribute] = entry
+
+    def refresh(self) -> bool:
+
+        # takes changes of other processes, e.g. of --set-* while the daemon is running
+        if self._stat() == self.mtime:
+            return False
+
+        self.load()
+        return True
+
+    def get(self, mac: str, attribute: str):
+
+        # cached value or None if it is unknown, invalidated or expired
+        self.refresh()
+        entry = self.entries.get(mac.upper(), dict()).get(attribute)
+        if not entry or entry[1] is None or self.clock() - entry[0] >= self.ttl[MetadataCache.ATTRIBUTES[attribute]]:
+            return None
+
+        value = entry[1]
+        return Alarm(**value) if isinstance(value, dict) else value
+
+    def put(self, mac: str, attribute: str, value) -> None:
+
+        if attribute not in MetadataCache.ATTRIBUTES or value is None:
+            return
+
+        if isinstance(value, Alarm):
+            value = dict(active=value.active, lower=value.lower,
+                         upper=value.upper, unit=value.unit)
+
+        self.entries.setdefault(mac.upper(), dict())[
+            attribute] = [self.clock(), value]
+        self.dirty = True
+
+    def invalidate(self, mac: str, *attributes: str) -> None:
+
+        entries = self.entries.setdefault(mac.upper(), dict())
+        for attribute in attributes:
+            entries[attribute] = [self.clock(), None]
+            self.dirty = True
+
+    def save(self) -> None:
+
+        if not self.dirty:
+            return
+
+        # file is merged first so that entries and invalidations of other processes are kept
+        self.load()
+        now = self.clock()
+        entries = {mac: {attribute: entry for attribute, entry in attributes.items()
+                         if entry[1] is not None or now - entry[0] < max(self.ttl.values())}
+                   for mac, attributes in self.entries.items()}
+        with open(self.filename + ".tmp", "w") as out:
+            json.dump({mac: attributes for mac, attributes in entries.items() if attributes}, out, indent=2)
+
+        os.replace(self.filename + ".tmp", self.filename)
+        self.mtime = self._stat()
+        self.dirty = False
+
+
+class Sightings():
+
+    _SIGHTINGS_FILE = ".govee_sightings.json"
+
+    # seconds between two saves while scanning
+    SAVE_INTERVAL = 10.0
+
+    def __init__(self, max_age: float = 300.0, filename: str = None, clock=time.time) -> None:
+
+        # seconds after which a device must be discovered again before connecting
+        self.max_age: float = max_age
+        self.filename: str = filename
+        self.clock = clock
+        self.mtime: int = None
+        self.saved: float = None
+
+        # BLEDevice, RSSI and time of last advertisement by address, BLEDevice is None if read from file
+        self.sightings: 'dict[str, tuple[BLEDevice, int, float]]' = dict()
+
+        # D-Bus path, adapter and name by address in order to connect to devices of former scans by BlueZ
+        self.details: 'dict[str, tuple[str, str, str]]' = dict()
+        self.load()
+
+    def __len__(self) -> int:
+
+        return len(self.sightings)
+
+    def _stat(self) -> int:
+
+        try:
+            return os.stat(self.filename).st_mtime_ns if self.filename else None
+        except OSError:
+            return None
+
+    def load(self) -> None:
+
+        self.mtime = self._stat()
+        if self.mtime is None:
+            return
+
+        try:
+            with open(self.filename, "r") as ins:
+                for address, (rssi, seen, *details) in json.load(ins).items():
+                    sighting = self.sightings.get(address)
+                    if sighting and sighting[2] >= seen:
+                        continue
+
+                    self.sightings[address] = (None, rssi, seen)
+                    if details and details[0]:
+                        self.details[address] = tuple(details[0])
+                    else:
+                        self.details.pop(address, None)
+
+        except (ValueError, TypeError):
+            LOGGER.warning(f"Unable to read sightings from {self.filename}")
+
+    def refresh(self) -> bool:
+
+        # takes sightings of other processes, e.g. of measure mode, if file has been changed since last load
+        if self._stat() == self.mtime:
+            return False
+
+        self.load()
+        return True
+
+    def see(self, device: 'BLEDevice', rssi: int) -> None:
+
+        self.sightings[device.address] = (device, rssi, self.clock())
+
+    def forget(self, address: str) -> None:
+
+        self.sightings.pop(address, None)
+        self.details.pop(address, None)
+
+    def get(self, address: str) -> 'BLEDevice':
+
+        # BLEDevice of last advertisement if it is recent enough to connect to
+        address = address.upper()
+        sighting = self.sightings.get(address)
+        if not sighting or self.clock() - sighting[2] >= self.max_age:
+            return None
+
+        if sighting[0] is None and address in self.details:
+            # only BlueZ can connect to a device by the details of a former scan
+            from bleak import BLEDevice
+
+            path, adapter, name = self.details[address]
+            return BLEDevice(address, name, {"path": path, "props": {"Adapter": adapter, "Alias": name}})
+
+        return sighting[0]
+
+    def rank(self, addresses: 'list[str]') -> 'list[str]':
+
+        # recently seen devices by signal strength, then devices seen before by time, unseen devices last
+        now = self.clock()
+
+        def key(address: str) -> 'tuple[int, float]':
+
+            sighting = self.sightings.get(address.upper())
+            if not sighting:
+                return 2, 0
+
+            _, rssi, seen = sighting
+            return (0, -(rssi if rssi is not None else -127)) if now - seen < self.max_age else (1, -seen)
+
+        return sorted(addresses, key=key)
+
+    @staticmethod
+    def _details(device: 'BLEDevice') -> 'list[str]':
+
+        details = getattr(device, "details", None)
+        if not isinstance(details, dict) or not isinstance(details.get("path"), str):
+            return None
+
+        props = details.get("props") or dict()
+        return [details["path"], props.get("Adapter"), props.get("Alias") or device.name]
+
+    def save(self, interval: float = None) -> None:
+
+        # with interval, saves only if the last save is older than given seconds
+        if not self.filename or (interval and self.saved and time.monotonic() - self.saved < interval):
+            return
+
+        sightings = {address: [rssi, seen, Sightings._details(device) if device else list(self.details.get(address, ())) or None]
+                     for address, (device, rssi, seen) in self.sightings.items()}
+        with open(self.filename + ".tmp", "w") as out:
+            json.dump(sightings, out, indent=2)
+
+        os.replace(self.filename + ".tmp", self.filename)
+        self.mtime = self._stat()
+        self.saved = time.monotonic()
+
+
+def __getattr__(name: str):
+
+    # known devices are read from ~/.known_govees on first use only
+    if name == "alias":
+        global alias
+        alias = Alias()
+        return alias
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
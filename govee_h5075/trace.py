@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+class Tracer():
+
+    def __init__(self, clock=time.perf_counter) -> None:
+
+        # nothing is recorded unless enabled, hot paths check enabled before recording
+        self.enabled: bool = False
+        self.clock = clock
+        self.pid: int = os.getpid()
+
+        # events in Chrome Trace Event format, each device gets its own track
+        self.events: 'list[dict]' = list()
+        self.tracks: 'dict[str, int]' = dict()
+        self.ids: int = 0
+
+    def enable(self, enabled: bool = True) -> 'Tracer':
+
+        self.enabled = enabled
+        return self
+
+    def reset(self) -> None:
+
+        self.events.clear()
+        self.tracks.clear()
+
+    def track(self, name: str) -> int:
+
+        tid = self.tracks.get(name)
+        if tid is None:
+            tid = self.tracks[name] = len(self.tracks) + 1
+            self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid,
+                                "tid": tid, "args": {"name": name}})
+
+        return tid
+
+    def complete(self, track: str, name: str, started: float, args: dict = None, category: str = "ble") -> None:
+
+        # span from started until now, times in microseconds
+        if not self.enabled:
+            return
+
+        event = {"name": name, "cat": category, "ph": "X", "pid": self.pid, "tid": self.track(track),
+                 "ts": started * 1e6, "dur": (self.clock() - started) * 1e6}
+        if args:
+            event["args"] = args
+
+        self.events.append(event)
+
+    def interval(self, track: str, name: str, started: float, args: dict = None, category: str = "ble") -> None:
+
+        # async span from started until now which may overlap other spans of the track, e.g. concurrent requests
+        if not self.enabled:
+            return
+
+        self.ids += 1
+        event = {"name": name, "cat": category, "id": self.ids, "pid": self.pid, "tid": self.track(track)}
+        self.events.append(dict(event, ph="b", ts=started * 1e6, **({"args": args} if args else dict())))
+        self.events.append(dict(event, ph="e", ts=self.clock() * 1e6))
+
+    def instant(self, track: str, name: str, args: dict = None, category: str = "ble") -> None:
+
+        if not self.enabled:
+            return
+
+        event = {"name": name, "cat": category, "ph": "i", "s": "t", "pid": self.pid,
+                 "tid": self.track(track), "ts": self.clock() * 1e6}
+        if args:
+            event["args"] = args
+
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, track: str, name: str, args: dict = None, category: str = "ble", overlap: bool = False):
+
+        started = self.clock()
+        try:
+            yield
+
+        finally:
+            (self.interval if overlap else self.complete)(
+                track, name, started, args=args, category=category)
+
+    def save(self, filename: str) -> None:
+
+        # opens in Perfetto or chrome://tracing
+        with open(filename, "w") as out:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, out)
+
+
+TRACER = Tracer()
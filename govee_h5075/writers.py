@@ -0,0 +1,226 @@
+import csv
+import json
+import sys
+import time
+from abc import ABC, abstractmethod
+
+from . import storage
+from .core import Measurement, MeasurementBatch
+
+
+class Writer(ABC):
+
+    FORMATS = ["table", "json", "ndjson", "csv"]
+
+    # lines after which the buffer is written regardless of the flush interval
+    MAX_LINES = 1024
+
+    def __init__(self, file=None, flush_interval: float = None) -> None:
+
+        self.file = file or sys.stdout
+        if flush_interval is None:
+            flush_interval = 0.0 if self.file.isatty() else 1.0
+
+        self.flush_interval: float = flush_interval
+        self._buffer: 'list[str]' = list()
+        self._flushed: float = time.monotonic()
+
+    @staticmethod
+    def create(format: str, file=None, flush_interval: float = None, live: bool = False) -> 'Writer':
+
+        # a stream of live measurements can't be a single JSON document
+        if format == "json" and live:
+            format = "ndjson"
+
+        return {"table": TableWriter, "json": JsonWriter, "ndjson": NdjsonWriter, "csv": CsvWriter}[format](file=file, flush_interval=flush_interval)
+
+    @property
+    def chunked(self) -> bool:
+
+        # records of a device may be written in several chunks as they are received
+        return True
+
+    @property
+    def interleaved(self) -> bool:
+
+        # records of several devices may be interleaved
+        return True
+
+    @staticmethod
+    def label(address: str) -> str:
+
+        return storage.alias.aliases[address][0] if address in storage.alias.aliases else address
+
+    @staticmethod
+    def alias_name(address: str) -> str:
+
+        return storage.alias.aliases[address][0] if address in storage.alias.aliases else None
+
+    @staticmethod
+    def reading(address: str, name: str, battery: int, measurement: Measurement) -> dict:
+
+        d = {"address": address, "alias": Writer.alias_name(address),
+             "name": name, "battery": battery, **measurement.to_dict()}
+        d["timestamp"] = measurement.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return d
+
+    def write(self, s: str) -> None:
+
+        self._buffer.append(s)
+        if not self.flush_interval or len(self._buffer) >= Writer.MAX_LINES or time.monotonic() - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+
+        if self._buffer:
+            self.file.write("".join(self._buffer))
+            self._buffer.clear()
+
+        self.file.flush()
+        self._flushed = time.monotonic()
+
+    def close(self) -> None:
+
+        self.flush()
+
+    def header(self, timestamp: bool = True) -> None:
+
+        pass
+
+    @abstractmethod
+    def measurement(self, address: str, name: str, battery: int, measurement: Measurement, timestamp: bool = True) -> None:
+
+        pass
+
+    @abstractmethod
+    def records(self, address: str, measurements: MeasurementBatch) -> None:
+
+        pass
+
+
+class TableWriter(Writer):
+
+    def __init__(self, file=None, flush_interval: float = None) -> None:
+
+        super().__init__(file=file, flush_interval=flush_interval)
+        self._address: str = None
+        self._started: bool = False
+
+    @property
+    def interleaved(self) -> bool:
+
+        return False
+
+    def header(self, timestamp: bool = True) -> None:
+
+        self.write(("Timestamp             " if timestamp else "") +
+                   "MAC-Address/Alias     Device name   Temperature  Dew point  Temperature  Dew point  Rel. humidity  Abs. humidity  Steam pressure  Battery\n")
+
+    def measurement(self, address: str, name: str, battery: int, measurement: Measurement, timestamp: bool = True) -> None:
+
+        label = Writer.label(address) + " " * 21
+        self.write(f"{measurement.timestamp.strftime('%Y-%m-%d %H:%M:%S') + '   ' if timestamp else ''}{label[:21]} {name}  {measurement.temperatureC:.1f}°C       {measurement.dewPointC:.1f}°C     {measurement.temperatureF:.1f}°F       {measurement.dewPointF:.1f}°F     {measurement.relHumidity:.1f}%          {measurement.absHumidity:.1f} g/m³      {measurement.steamPressure:.1f} mbar       {battery}%\n")
+
+    def records(self, address: str, measurements: MeasurementBatch) -> None:
+
+        if not self._started or address != self._address:
+            if address:
+                self.write(f"\nMAC-Address/Alias: {Writer.label(address)}\n")
+
+            self.write("Timestamp         Temperature  Dew point  Temperature  Dew point  Rel. humidity  Abs. humidity  Steam pressure\n")
+            self._address = address
+            self._started = True
+
+        for timestamp, temperatureC, dewPointC, temperatureF, dewPointF, relHumidity, absHumidity, steamPressure in measurements.rows():
+            self.write(f"{timestamp.strftime('%Y-%m-%d %H:%M')}  {temperatureC:.1f}°C       {dewPointC:.1f}°C     {temperatureF:.1f}°F       "
+                       f"{dewPointF:.1f}°F     {relHumidity:.1f}%          {absHumidity:.1f} g/m³      {steamPressure:.1f} mbar\n")
+
+
+class JsonWriter(Writer):
+
+    def __init__(self, file=None, flush_interval: float = None) -> None:
+
+        super().__init__(file=file, flush_interval=flush_interval)
+
+        # records of several devices or measurements are written as a single array with a document each
+        self._documents: int = 0
+        self._written: bool = False
+
+    @property
+    def chunked(self) -> bool:
+
+        return False
+
+    @property
+    def interleaved(self) -> bool:
+
+        return False
+
+    def document(self, d: dict) -> None:
+
+        self.write(("[\n" if not self._documents else ",\n") + json.dumps(d, indent=2))
+        self._documents += 1
+        self._written = True
+
+    def measurement(self, address: str, name: str, battery: int, measurement: Measurement, timestamp: bool = True) -> None:
+
+        self.document(Writer.reading(address, name, battery, measurement))
+
+    def records(self, address: str, measurements: MeasurementBatch) -> None:
+
+        if address:
+            self.document({"address": address, "measurements": measurements.to_dicts()})
+        else:
+            self.write(json.dumps(measurements.to_dicts(), indent=2) + "\n")
+
+        self._written = True
+
+    def close(self) -> None:
+
+        if self._documents:
+            self.write("\n]\n")
+            self._documents = 0
+        elif not self._written:
+            self.write("[]\n")
+
+        self._written = True
+        super().close()
+
+
+class NdjsonWriter(Writer):
+
+    def measurement(self, address: str, name: str, battery: int, measurement: Measurement, timestamp: bool = True) -> None:
+
+        self.write(json.dumps(Writer.reading(address, name, battery, measurement)) + "\n")
+
+    def records(self, address: str, measurements: MeasurementBatch) -> None:
+
+        for d in measurements.dicts():
+            self.write(json.dumps({"address": address, **d} if address else d) + "\n")
+
+
+class CsvWriter(Writer):
+
+    FIELDS = ["timestamp", "address", "alias", "name", "battery", "temperatureC", "temperatureF", "temperatureOffset",
+              "relHumidity", "humidityOffset", "absHumidity", "dewPointC", "dewPointF", "steamPressure"]
+
+    def __init__(self, file=None, flush_interval: float = None) -> None:
+
+        super().__init__(file=file, flush_interval=flush_interval)
+        self._writer = csv.DictWriter(
+            self, fieldnames=CsvWriter.FIELDS, extrasaction="ignore", lineterminator="\n")
+        self._writer.writeheader()
+
+    def measurement(self, address: str, name: str, battery: int, measurement: Measurement, timestamp: bool = True) -> None:
+
+        d = measurement.to_dict()
+        d.update(timestamp=measurement.timestamp.strftime("%Y-%m-%d %H:%M:%S"), address=address,
+                 alias=Writer.alias_name(address), name=name, battery=battery)
+        self._writer.writerow(d)
+
+    def records(self, address: str, measurements: MeasurementBatch) -> None:
+
+        label = Writer.alias_name(address)
+        for d in measurements.dicts():
+            d.update(address=address, alias=label)
+            self._writer.writerow(d)
@@ -0,0 +1,65 @@
+import asyncio
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+import govee_h5075.device
+from govee_h5075 import cli
+from govee_h5075.core import Measurement
+from govee_h5075.simulator import SimulatedClient, SimulatedDevice, SimulatedGoveeThermometerHygrometer
+from govee_h5075.storage import HistorySync, MeasurementStore
+
+
+class TestHistorySync(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.directory = tempfile.mkdtemp()
+        self.history = HistorySync(MeasurementStore(self.directory))
+        self.device = govee_h5075.device.GoveeThermometerHygrometer
+        govee_h5075.device.GoveeThermometerHygrometer = SimulatedGoveeThermometerHygrometer
+
+    def tearDown(self) -> None:
+
+        govee_h5075.device.GoveeThermometerHygrometer = self.device
+        shutil.rmtree(self.directory)
+
+    def sync(self, mac: str, start: str = None) -> None:
+
+        asyncio.run(cli.download_recorded_data(
+            mac, start=start, end=None, timeout=1.0, history=self.history))
+
+    def test_watermark_older_than_window(self) -> None:
+
+        for model, mac in [("H5075", "A4:C1:38:00:00:41"), ("H5179", "A4:C1:38:00:00:42")]:
+            with self.subTest(model=model):
+                SimulatedClient.add(SimulatedDevice(mac, model=model))
+                now = Measurement.minutes_since_1970(datetime.now())
+                self.history.watermarks[mac] = now - 180
+
+                # default window is 60 minutes, minutes before it have to be requested as well
+                self.sync(mac)
+                self.assertEqual(len(self.history.load(mac, now - 179, now - 61)), 119)
+                self.assertGreaterEqual(self.history.watermark(mac), now - 1)
+
+    def test_start_after_watermark(self) -> None:
+
+        mac = "A4:C1:38:00:00:43"
+        SimulatedClient.add(SimulatedDevice(mac))
+        now = Measurement.minutes_since_1970(datetime.now())
+        self.history.watermarks[mac] = now - 180
+
+        # records of --start are stored but the minutes before are still missing
+        self.sync(mac, start="0:30")
+        self.assertEqual(self.history.watermark(mac), now - 180)
+        self.assertEqual(len(self.history.load(mac, now - 179, now - 31)), 0)
+        self.assertGreater(len(self.history.load(mac, now - 30, now)), 0)
+
+        self.sync(mac)
+        self.assertEqual(len(self.history.load(mac, now - 179, now - 31)), 149)
+        self.assertGreaterEqual(self.history.watermark(mac), now - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()